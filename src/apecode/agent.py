@@ -2,7 +2,15 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import hashlib
+import itertools
+import json
+import math
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Protocol
 
@@ -16,26 +24,171 @@ class ChatModel(Protocol):
         """Return one assistant message."""
 
 
+class StreamingChatModel(ChatModel, Protocol):
+    """Chat model adapter that can also stream incremental deltas."""
+
+    def stream(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Yield deltas with content_delta, reasoning_delta, tool_calls_delta and finish_reason."""
+
+
 def _coerce_text(content: Any) -> str:
-    if content is None:
-        return ""
     if isinstance(content, str):
         return content
+    if content is None:
+        return ""
     if isinstance(content, list):
-        parts: list[str] = []
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                parts.append(str(item.get("text", "")))
-        return "".join(parts)
+        return "".join(_iter_text_blocks(content))
     return str(content)
 
 
+def _iter_text_blocks(content: list[Any]) -> Iterator[str]:
+    for item in content:
+        if isinstance(item, dict) and item.get("type") == "text":
+            text = item.get("text", "")
+            yield text if isinstance(text, str) else str(text)
+
+
+def _estimate_tokens(message: dict[str, Any]) -> int:
+    """Cheap token estimate (~4 characters per token) used for context budgeting."""
+    chars = len(_coerce_text(message.get("content")))
+    for call in message.get("tool_calls") or []:
+        function = call.get("function") or {}
+        chars += len(str(function.get("name", ""))) + len(str(function.get("arguments", "")))
+    # Fixed per-message overhead for role and framing tokens
+    return chars // 4 + 4
+
+
+def _noop(*_args: Any) -> None:
+    return None
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+# Turns with fewer words ("yes", "continue", "do it") only make sense in context and are never cached
+_CACHE_MIN_WORDS = 4
+
+
+# Paths, file names, snake_case names and numbers; punctuation around them is trimmed
+_IDENTIFIER_RE = re.compile(r"\S*[/._\d]\S*")
+_IDENTIFIER_EDGE_CHARS = ".,;:!?()[]{}<>'\"`"
+
+
+def _identifiers(text: str) -> frozenset[str]:
+    """Return the path- and identifier-like tokens a cached answer must agree on exactly."""
+    tokens = (token.strip(_IDENTIFIER_EDGE_CHARS) for token in _IDENTIFIER_RE.findall(text))
+    return frozenset(token for token in tokens if any(char in "/._" or char.isdigit() for char in token))
+
+
+def _term_vector(text: str) -> dict[str, float]:
+    """Return an L2-normalized vector of words and word bigrams for similarity matching."""
+    words = _WORD_RE.findall(text.lower())
+    # Bigrams make word order count: "rename foo to bar" and "rename bar to foo" share no bigram
+    counts = Counter(words)
+    counts.update(f"{first} {second}" for first, second in itertools.pairwise(words))
+    norm = math.sqrt(sum(count * count for count in counts.values()))
+    if not norm:
+        return {}
+    return {term: count / norm for term, count in counts.items()}
+
+
 @dataclass(slots=True)
+class _CacheEntry:
+    vector: dict[str, float]
+    identifiers: frozenset[str]
+    response: dict[str, Any]
+    expires_at: float
+
+
+class SemanticCache:
+    """In-memory cache of final answers keyed by similar user turns.
+
+    Entries are partitioned by a namespace derived from the system prompt and
+    tool schema, matched by cosine similarity, expired after ``ttl_sec`` and
+    evicted least-recently-used beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.9,
+        ttl_sec: float = 300.0,
+        max_entries: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl_sec = ttl_sec
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+
+    @staticmethod
+    def namespace(system_prompt: str, tools: list[dict[str, Any]]) -> str:
+        digest = hashlib.sha1(system_prompt.encode("utf-8"))
+        digest.update(json.dumps(tools, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, namespace: str, text: str) -> dict[str, Any] | None:
+        now = self._clock()
+        query = _term_vector(text)
+        identifiers = _identifiers(text)
+        best_key: tuple[str, str] | None = None
+        best_score = self.threshold
+        for key, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[key]
+                continue
+            # Similar wording about a different file or symbol is a different question
+            if key[0] != namespace or entry.identifiers != identifiers:
+                continue
+            score = sum(weight * entry.vector.get(term, 0.0) for term, weight in query.items())
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return dict(self._entries[best_key].response)
+
+    def put(self, namespace: str, text: str, response: dict[str, Any]) -> None:
+        key = (namespace, text)
+        self._entries[key] = _CacheEntry(
+            vector=_term_vector(text),
+            identifiers=_identifiers(text),
+            response=dict(response),
+            expires_at=self._clock() + self.ttl_sec,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@dataclass(frozen=True, slots=True)
 class AgentConfig:
     """Runtime knobs for agent execution."""
 
     max_steps: int = 20
 
+    semantic_cache_enabled: bool = False
+    """Reuse final answers for near-duplicate user turns asked at the same point of a conversation."""
+
+    cache_threshold: float = 0.9
+    """Minimum cosine similarity between user turns for a cache hit."""
+
+    cache_ttl_sec: float = 300.0
+    """Seconds before a cached answer expires."""
+
+    parallel_tool_calls: bool = True
+    """Run a step's tool calls concurrently when none of them is mutating."""
+
+    max_tool_workers: int = 8
+    """Upper bound on worker threads for parallel tool calls."""
+
+    history_window: int | None = None
+    """Opt-in cap on non-system messages kept in context; the last completed turn is always kept whole. None (default) keeps the full history."""
+
+    context_token_budget: int | None = None
+    """Approximate context size in tokens; oldest turns are evicted beyond 80% of it."""
+
 
 @dataclass(slots=True)
 class AgentCallbacks:
@@ -53,6 +206,9 @@ class AgentCallbacks:
     on_tool_result: Callable[[str, str], None] | None = None
     """Called after tool execution with (tool_name, result_text)."""
 
+    on_token: Callable[[str], None] | None = None
+    """Called with each streamed content chunk. Enables streaming when the model supports it."""
+
 
 class NanoCodeAgent:
     """A tiny tool-calling loop with Chat Completions."""
@@ -72,59 +228,220 @@ class NanoCodeAgent:
         self.tools = tools
         self.config = config or AgentConfig()
         self.cb = callbacks or AgentCallbacks(on_tool_call=on_tool_call)
-        self.messages: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+        # Bound once so the loop calls callbacks directly instead of looking them up by name
+        self._on_status = self.cb.on_status or _noop
+        self._on_thinking = self.cb.on_thinking or _noop
+        self._on_tool_call = self.cb.on_tool_call or _noop
+        self._on_tool_result = self.cb.on_tool_result or _noop
+        self._on_token = self.cb.on_token or _noop
+        self._system: dict[str, Any] = {"role": "system", "content": system_prompt}
+        self._turns: deque[dict[str, Any]] = deque()
+        self._turn_start: dict[str, Any] | None = None
+        # User message that opened the most recent completed turn; history trimming never evicts past it
+        self._last_complete_start: dict[str, Any] | None = None
+        self._messages_view: list[dict[str, Any]] | None = None
+        self._token_count = _estimate_tokens(self._system)
+        self._tools_schema: list[dict[str, Any]] = []
+        self._tools_version = -1
+        self._cache_namespace = ""
+        # Digest of the message preceding the running turn; cached answers are only reused in the same context
+        self._turn_context = ""
+        self._cache: SemanticCache | None = None
+        if self.config.semantic_cache_enabled:
+            self._cache = SemanticCache(threshold=self.config.cache_threshold, ttl_sec=self.config.cache_ttl_sec)
+
+    @property
+    def messages(self) -> list[dict[str, Any]]:
+        """Outgoing transcript: the pinned system message followed by the history window."""
+        if self._messages_view is None:
+            self._messages_view = [self._system, *self._turns]
+        return self._messages_view
+
+    @property
+    def context_tokens(self) -> int:
+        """Estimated token count of the current outgoing transcript."""
+        return self._token_count
+
+    def _append(self, message: dict[str, Any]) -> None:
+        self._turns.append(message)
+        self._token_count += _estimate_tokens(message)
+        if self._messages_view is not None:
+            self._messages_view.append(message)
+        self._trim_history()
+
+    def _over_limits(self) -> bool:
+        window = self.config.history_window
+        if window is not None and len(self._turns) > window:
+            return True
+        budget = self.config.context_token_budget
+        return budget is not None and self._token_count > budget * 0.8
+
+    def _evict_oldest(self) -> None:
+        self._token_count -= _estimate_tokens(self._turns.popleft())
+
+    def _trim_history(self) -> None:
+        if not self._over_limits():
+            return
+        # Keep the last completed turn whole, however long it was, so a follow-up still sees its answer;
+        # before any turn has completed only the running one is protected
+        keep_from = self._last_complete_start or self._turn_start
+        before = len(self._turns)
+        while self._over_limits() and self._turns and self._turns[0] is not keep_from:
+            self._evict_oldest()
+        # Drop tool results and tool-call records orphaned by the eviction; keep_from is a user message, so this stops there
+        while self._turns and self._turns[0].get("role") != "user":
+            self._evict_oldest()
+        # Earlier entries are left untouched between evictions so provider prefix caches keep hitting
+        if len(self._turns) != before:
+            self._messages_view = None
+
+    def _context_digest(self) -> str:
+        if not self._turns:
+            return ""
+        encoded = json.dumps(self._turns[-1], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+    def _finish_turn(self, message: dict[str, Any]) -> None:
+        # Marked before appending so trimming on the final answer may drop the previous turn
+        self._last_complete_start = self._turn_start
+        self._append(message)
+
+    def _tool_schema(self) -> list[dict[str, Any]]:
+        # Rebuilt only when plugins/MCP register new tools after construction
+        if self._tools_version != self.tools.version:
+            self._tools_schema = self.tools.as_openai_tools()
+            self._tools_version = self.tools.version
+            self._cache_namespace = ""
+        return self._tools_schema
+
+    def _complete(self, tools: list[dict[str, Any]]) -> dict[str, Any]:
+        stream = getattr(self.model, "stream", None)
+        if stream is None or self.cb.on_token is None:
+            return self.model.complete(messages=self.messages, tools=tools)
 
-    def _fire(self, name: str, *args: Any) -> None:
-        fn = getattr(self.cb, name, None)
-        if fn is not None:
-            fn(*args)
+        content_parts: list[str] = []
+        reasoning_parts: list[str] = []
+        calls: dict[int, dict[str, Any]] = {}
+        for delta in stream(messages=self.messages, tools=tools):
+            text = delta.get("content_delta")
+            if text:
+                content_parts.append(text)
+                self._on_token(text)
+            reasoning = delta.get("reasoning_delta")
+            if reasoning:
+                reasoning_parts.append(reasoning)
+            # Tool calls arrive in fragments that share an index
+            for fragment in delta.get("tool_calls_delta") or []:
+                merged = calls.setdefault(
+                    int(fragment.get("index", len(calls))),
+                    {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+                )
+                if fragment.get("id"):
+                    merged["id"] = str(fragment["id"])
+                function = fragment.get("function") or {}
+                merged["function"]["name"] += str(function.get("name") or "")
+                merged["function"]["arguments"] += str(function.get("arguments") or "")
+
+        assistant: dict[str, Any] = {"role": "assistant", "content": "".join(content_parts)}
+        if reasoning_parts:
+            assistant["reasoning_content"] = "".join(reasoning_parts)
+        if calls:
+            tool_calls = [calls[index] for index in sorted(calls)]
+            for call in tool_calls:
+                call["function"]["arguments"] = call["function"]["arguments"] or "{}"
+            assistant["tool_calls"] = tool_calls
+        return assistant
+
+    def _complete_with_cache(self, user_input: str, *, first_step: bool) -> dict[str, Any]:
+        tools = self._tool_schema()
+        # Only the first step of a turn depends solely on the user input and what preceded it
+        if self._cache is None or not first_step or len(_WORD_RE.findall(user_input)) < _CACHE_MIN_WORDS:
+            return self._complete(tools)
+        if not self._cache_namespace:
+            self._cache_namespace = SemanticCache.namespace(str(self._system["content"]), tools)
+        namespace = f"{self._cache_namespace}:{self._turn_context}"
+        cached = self._cache.get(namespace, user_input)
+        if cached is not None:
+            return cached
+        assistant = self._complete(tools)
+        # Tool-calling turns depend on workspace state, so never replay them
+        if not assistant.get("tool_calls"):
+            self._cache.put(namespace, user_input, assistant)
+        return assistant
+
+    def _can_run_in_parallel(self, calls: list[tuple[str, str, str]]) -> bool:
+        if not self.config.parallel_tool_calls or len(calls) < 2:
+            return False
+        # Mutating tools may prompt for approval and depend on ordering
+        for _call_id, name, _arguments in calls:
+            tool = self.tools.get(name)
+            if tool is not None and tool.mutating:
+                return False
+        return True
+
+    def _run_tool_calls(self, tool_calls: list[dict[str, Any]]) -> None:
+        calls: list[tuple[str, str, str]] = []
+        for call in tool_calls:
+            function = call.get("function") or {}
+            calls.append((str(call.get("id", "")), str(function.get("name", "")), str(function.get("arguments", "{}"))))
+
+        if self._can_run_in_parallel(calls):
+            for _call_id, name, arguments in calls:
+                self._on_tool_call(name, arguments)
+            with ThreadPoolExecutor(max_workers=max(1, min(len(calls), self.config.max_tool_workers))) as pool:
+                futures = [pool.submit(self.tools.execute, name, arguments) for _call_id, name, arguments in calls]
+                # Results are reported and recorded in call order to keep tool_call_id pairing stable
+                for (call_id, name, _arguments), future in zip(calls, futures, strict=True):
+                    result = future.result()
+                    self._on_tool_result(name, result)
+                    self._append({"role": "tool", "tool_call_id": call_id, "content": result})
+            return
+
+        for call_id, name, arguments in calls:
+            self._on_tool_call(name, arguments)
+            result = self.tools.execute(name, arguments)
+            self._on_tool_result(name, result)
+            self._append(
+                {
+                    "role": "tool",
+                    "tool_call_id": call_id,
+                    "content": result,
+                }
+            )
 
     def run(self, user_input: str) -> str:
         """Run one user turn to completion."""
-        self.messages.append({"role": "user", "content": user_input})
-        for _ in range(self.config.max_steps):
-            self._fire("on_status", "Thinking...")
-            assistant = self.model.complete(
-                messages=self.messages,
-                tools=self.tools.as_openai_tools(),
-            )
-            self._fire("on_status", "")
+        if self._cache is not None:
+            self._turn_context = self._context_digest()
+        self._turn_start = {"role": "user", "content": user_input}
+        self._append(self._turn_start)
+        for step in range(self.config.max_steps):
+            self._on_status("Thinking...")
+            assistant = self._complete_with_cache(user_input, first_step=step == 0)
+            self._on_status("")
 
-            # Show thinking if present
+            content = assistant.get("content")
             reasoning = assistant.get("reasoning_content")
+            tool_calls = assistant.get("tool_calls")
+            # Fast path: plain final answer
+            if not tool_calls and not reasoning:
+                self._finish_turn({"role": "assistant", "content": content})
+                return _coerce_text(content)
+
+            # Show thinking if present
             if reasoning:
-                self._fire("on_thinking", str(reasoning))
+                self._on_thinking(str(reasoning))
 
-            tool_calls = assistant.get("tool_calls") or []
-            assistant_record: dict[str, Any] = {
-                "role": "assistant",
-                "content": assistant.get("content"),
-            }
+            assistant_record: dict[str, Any] = {"role": "assistant", "content": content}
             # Preserve provider-specific fields (e.g. reasoning_content for thinking models)
-            for key in ("reasoning_content",):
-                if assistant.get(key):
-                    assistant_record[key] = assistant[key]
-            if tool_calls:
-                assistant_record["tool_calls"] = tool_calls
-            self.messages.append(assistant_record)
-
+            if reasoning:
+                assistant_record["reasoning_content"] = reasoning
             if not tool_calls:
-                return _coerce_text(assistant.get("content"))
+                self._finish_turn(assistant_record)
+                return _coerce_text(content)
+            assistant_record["tool_calls"] = tool_calls
+            self._append(assistant_record)
 
-            for call in tool_calls:
-                call_id = str(call.get("id", ""))
-                function = call.get("function") or {}
-                name = str(function.get("name", ""))
-                arguments = str(function.get("arguments", "{}"))
-                self._fire("on_tool_call", name, arguments)
-                result = self.tools.execute(name, arguments)
-                self._fire("on_tool_result", name, result)
-                self.messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": call_id,
-                        "content": result,
-                    }
-                )
+            self._run_tool_calls(tool_calls)
 
         raise RuntimeError(f"max steps exceeded ({self.config.max_steps})")
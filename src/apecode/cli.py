@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Annotated
 
@@ -18,8 +20,10 @@ from apecode.commands import (
 from apecode.console import (
     InputSession,
     ask_approval,
+    background,
     console,
     print_agent,
+    print_agent_stream,
     print_error,
     print_plan,
     print_status,
@@ -28,6 +32,7 @@ from apecode.console import (
     print_tool_result,
     set_status,
 )
+from apecode.fs import sorted_entries
 from apecode.mcp import McpBridge, load_mcp_tools
 from apecode.model_adapters import ModelError, create_model_client
 from apecode.plugins import load_plugins
@@ -49,10 +54,16 @@ class AppRuntime:
     agent: NanoCodeAgent
     commands: CommandRegistry
     mcp_bridge: McpBridge | None = None
+    resources: ExitStack = field(default_factory=ExitStack)
 
     def close(self) -> None:
-        if self.mcp_bridge is not None:
-            self.mcp_bridge.close()
+        self.resources.close()
+
+    def __enter__(self) -> AppRuntime:
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        self.close()
 
 
 def _version_callback(value: bool) -> None:
@@ -70,19 +81,40 @@ def _approval_prompt(yolo_state: dict[str, bool], action: str, preview: str) ->
     return result
 
 
-def _collect_skill_roots(cwd: Path, arg_values: list[str]) -> list[Path]:
-    roots = [Path(item).expanduser() for item in arg_values]
+def _expand_path(raw: str, home: Path) -> Path:
+    """Expand a leading ``~`` against a precomputed home directory."""
+    if raw == "~":
+        return home
+    if raw.startswith("~/"):
+        return home / raw[2:]
+    if raw.startswith("~"):
+        # ~user forms need a passwd lookup
+        return Path(raw).expanduser()
+    return Path(raw)
+
+
+def _collect_skill_roots(cwd: Path, arg_values: list[str], home: Path) -> list[Path]:
+    roots = [_expand_path(item, home) for item in arg_values]
     roots.append(cwd / "skills")
     return roots
 
 
-def _collect_mcp_configs(cwd: Path, arg_values: list[str]) -> list[Path]:
-    paths = [Path(item).expanduser() for item in arg_values]
+def _collect_mcp_configs(cwd: Path, arg_values: list[str], home: Path) -> list[Path]:
+    paths = [_expand_path(item, home) for item in arg_values]
     paths.append(cwd / ".mcp.json")
     paths.append(cwd / "apecode_mcp.json")
     return paths
 
 
+def _top_level_listing(cwd: Path) -> str | None:
+    """List workspace entries for the system prompt; directories get a trailing slash."""
+    try:
+        entries = [f"{entry.name}{'/' if entry.is_dir() else ''}" for entry in sorted_entries(cwd)]
+    except OSError:
+        return None
+    return "\n".join(entries) if entries else None
+
+
 def _register_plugin_commands(runtime_commands: CommandRegistry, plugin_commands) -> tuple[int, list[str]]:
     loaded = 0
     errors: list[str] = []
@@ -109,15 +141,16 @@ def _make_callbacks(tool_context: ToolContext, *, indent: str = "") -> AgentCall
     def _on_tool_result(name: str, result: str) -> None:
         # Special display for plan updates
         if name == "update_plan":
-            print_plan(tool_context.plan)
+            background.submit(print_plan, list(tool_context.plan))
         else:
-            print_tool_result(name, result)
+            background.submit(print_tool_result, name, result)
 
     return AgentCallbacks(
         on_status=set_status,
-        on_thinking=lambda text: print_thinking(text),
-        on_tool_call=lambda name, args: print_tool_call(name, args),
+        on_thinking=lambda text: background.submit(print_thinking, text),
+        on_tool_call=lambda name, args: background.submit(print_tool_call, name, args),
         on_tool_result=_on_tool_result,
+        on_token=print_agent_stream,
     )
 
 
@@ -135,10 +168,12 @@ def _build_runtime(
     plugin_dirs: list[str],
     mcp_configs: list[str],
     skill_dirs: list[str],
+    semantic_cache: bool = False,
 ) -> AppRuntime:
     if yolo:
         approval_policy = ApprovalPolicy.ALWAYS
-    cwd = cwd.expanduser().resolve()
+    home = Path.home()
+    cwd = _expand_path(str(cwd), home).resolve()
     yolo_state = {"enabled": yolo}
     tool_context = ToolContext(
         cwd=cwd,
@@ -146,74 +181,79 @@ def _build_runtime(
         sandbox_mode=sandbox_mode,
         approval_policy=approval_policy,
     )
-    tools = create_default_registry(tool_context)
-    plugin_dir_paths = [Path(item) for item in plugin_dirs]
-    plugin_dir_paths.append(cwd / "plugins")
-    plugin_result = load_plugins(tools, plugin_dir_paths)
-    if plugin_result.tool_names:
-        print_status(f"[plugin] loaded {len(plugin_result.tool_names)} tools")
-    for error in plugin_result.errors:
-        print_error(f"[plugin] {error}")
-
-    mcp_config_paths = _collect_mcp_configs(cwd, mcp_configs)
-    mcp_bridge = load_mcp_tools(tools, mcp_config_paths)
-    if mcp_bridge.tool_names:
-        print_status(f"[mcp] loaded {len(mcp_bridge.tool_names)} tools")
-    for error in mcp_bridge.errors:
-        print_error(f"[mcp] {error}")
-
-    skill_roots = _collect_skill_roots(cwd, skill_dirs)
-    skills = SkillCatalog.from_roots(skill_roots)
-    if plugin_result.skills:
-        initial_count = len(skills.list_skills())
-        skills = skills.with_additional(plugin_result.skills)
-        merged_count = len(skills.list_skills()) - initial_count
-        if merged_count > 0:
-            print_status(f"[plugin] loaded {merged_count} skills")
-    _dir_entries: list[str] = []
-    try:
-        for item in sorted(cwd.iterdir()):
-            _dir_entries.append(f"{item.name}{'/' if item.is_dir() else ''}")
-    except OSError:
-        pass
-    _dir_listing = "\n".join(_dir_entries) if _dir_entries else None
-    base_prompt = build_system_prompt(cwd, skills_overview=skills.format_for_system_prompt(), dir_listing=_dir_listing)
-
-    model_client = create_model_client(
-        provider=provider,
-        model=model,
-        timeout=timeout,
-        temperature=temperature,
-    )
-
-    # Subagent callbacks show indented output
-    sub_callbacks = _make_callbacks(tool_context, indent="    ")
-    subagents = SubagentProxy(
-        SubagentRunner(
-            model=model_client,
-            parent_tools=tools,
-            base_system_prompt=base_prompt,
-            max_steps=min(8, max(2, max_steps)),
-            callbacks=sub_callbacks,
+    # Everything acquired below is released on failure or when the runtime closes
+    with ExitStack() as resources:
+        tools = create_default_registry(tool_context)
+        plugin_dir_paths = [_expand_path(item, home) for item in plugin_dirs]
+        plugin_dir_paths.append(cwd / "plugins")
+        mcp_config_paths = _collect_mcp_configs(cwd, mcp_configs, home)
+        skill_roots = _collect_skill_roots(cwd, skill_dirs, home)
+
+        # The skill scan touches no shared state, so it overlaps the tool loaders
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            skills_future = pool.submit(SkillCatalog.from_roots, skill_roots)
+            # Plugins and MCP both register into `tools`, so they run in a fixed order and name clashes
+            # resolve the same way every run; each loader parallelizes its own I/O
+            plugin_result = load_plugins(tools, plugin_dir_paths)
+            mcp_bridge = load_mcp_tools(tools, mcp_config_paths)
+            # Registered before anything else can raise, so the bridge's loop thread and servers are not leaked
+            resources.callback(mcp_bridge.close)
+            skills = skills_future.result()
+
+        if plugin_result.tool_names:
+            print_status(f"[plugin] loaded {len(plugin_result.tool_names)} tools")
+        for error in plugin_result.errors:
+            print_error(f"[plugin] {error}")
+        if mcp_bridge.tool_names:
+            print_status(f"[mcp] loaded {len(mcp_bridge.tool_names)} tools")
+        for error in mcp_bridge.errors:
+            print_error(f"[mcp] {error}")
+
+        if plugin_result.skills:
+            initial_count = len(skills.list_skills())
+            skills = skills.with_additional(plugin_result.skills)
+            merged_count = len(skills.list_skills()) - initial_count
+            if merged_count > 0:
+                print_status(f"[plugin] loaded {merged_count} skills")
+        base_prompt = build_system_prompt(cwd, skills_overview=skills.format_for_system_prompt(), dir_listing=_top_level_listing(cwd))
+
+        model_client = create_model_client(
+            provider=provider,
+            model=model,
+            timeout=timeout,
+            temperature=temperature,
+        )
+        resources.callback(model_client.close)
+
+        # Subagent callbacks show indented output
+        sub_callbacks = _make_callbacks(tool_context, indent="    ")
+        subagents = SubagentProxy(
+            SubagentRunner(
+                model=model_client,
+                parent_tools=tools,
+                base_system_prompt=base_prompt,
+                max_steps=min(8, max(2, max_steps)),
+                callbacks=sub_callbacks,
+            )
+        )
+        commands = create_default_commands(tools=tools, skills=skills, subagents=subagents)
+        loaded_command_count, command_errors = _register_plugin_commands(commands, plugin_result.commands)
+        if loaded_command_count > 0:
+            print_status(f"[plugin] loaded {loaded_command_count} commands")
+        for error in command_errors:
+            print_error(f"[plugin] {error}")
+        return AppRuntime(
+            agent=NanoCodeAgent(
+                model=model_client,
+                tools=tools,
+                system_prompt=base_prompt,
+                config=AgentConfig(max_steps=max(1, max_steps), semantic_cache_enabled=semantic_cache),
+                callbacks=_make_callbacks(tool_context),
+            ),
+            commands=commands,
+            mcp_bridge=mcp_bridge,
+            resources=resources.pop_all(),
         )
-    )
-    commands = create_default_commands(tools=tools, skills=skills, subagents=subagents)
-    loaded_command_count, command_errors = _register_plugin_commands(commands, plugin_result.commands)
-    if loaded_command_count > 0:
-        print_status(f"[plugin] loaded {loaded_command_count} commands")
-    for error in command_errors:
-        print_error(f"[plugin] {error}")
-    return AppRuntime(
-        agent=NanoCodeAgent(
-            model=model_client,
-            tools=tools,
-            system_prompt=base_prompt,
-            config=AgentConfig(max_steps=max(1, max_steps)),
-            callbacks=_make_callbacks(tool_context),
-        ),
-        commands=commands,
-        mcp_bridge=mcp_bridge,
-    )
 
 
 def _execute_agent_turn(agent: NanoCodeAgent, text: str) -> tuple[bool, str]:
@@ -296,6 +336,10 @@ def main(
         typer.Option(help="Skill root directory (can be repeated)."),
     ] = None,
     yolo: Annotated[bool, typer.Option("--yolo", help="Shortcut for --approval-policy always.")] = False,
+    semantic_cache: Annotated[
+        bool,
+        typer.Option("--semantic-cache", help="Reuse answers for near-duplicate prompts within a session."),
+    ] = False,
     version: Annotated[
         bool | None,
         typer.Option(
@@ -310,7 +354,6 @@ def main(
     """ApeCode - nano terminal code agent."""
     workspace = Path(cwd) if cwd else Path.cwd()
 
-    runtime: AppRuntime | None = None
     try:
         runtime = _build_runtime(
             provider=provider,
@@ -325,12 +368,13 @@ def main(
             plugin_dirs=plugin_dir or [],
             mcp_configs=mcp_config or [],
             skill_dirs=skill_dir or [],
+            semantic_cache=semantic_cache,
         )
     except RuntimeError as exc:
         print_error(f"ApeCode setup error: {exc}")
         raise typer.Exit(code=1) from None
 
-    try:
+    with runtime:
         prompt_text = " ".join(prompt).strip() if prompt else ""
         if not prompt_text:
             code = _run_repl(runtime)
@@ -350,6 +394,3 @@ def main(
             print_error(f"ApeCode runtime error: {output}")
             raise typer.Exit(code=2)
         print_agent(output)
-    finally:
-        if runtime is not None:
-            runtime.close()
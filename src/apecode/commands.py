@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import bisect
+import difflib
 from collections.abc import Callable
 from dataclasses import dataclass
 
@@ -34,19 +36,25 @@ class SlashCommand:
 class CommandRegistry:
     """Registry for slash commands."""
 
+    __slots__ = ("_commands", "_sorted_names")
+
     def __init__(self) -> None:
         self._commands: dict[str, SlashCommand] = {}
+        self._sorted_names: list[str] = []
 
     def register(self, command: SlashCommand, *, replace: bool = False) -> None:
-        if not replace and command.name in self._commands:
+        exists = command.name in self._commands
+        if not replace and exists:
             raise ValueError(f"command already registered: /{command.name}")
         self._commands[command.name] = command
+        if not exists:
+            bisect.insort(self._sorted_names, command.name)
 
     def get(self, name: str) -> SlashCommand | None:
         return self._commands.get(name)
 
     def list_commands(self) -> list[SlashCommand]:
-        return [self._commands[name] for name in sorted(self._commands)]
+        return [self._commands[name] for name in self._sorted_names]
 
     def run(self, raw_input: str) -> CommandResult | None:
         if not raw_input.startswith("/"):
@@ -54,13 +62,13 @@ class CommandRegistry:
         payload = raw_input[1:].strip()
         if not payload:
             return CommandResult(output="Empty slash command. Use /help.")
-        if " " in payload:
-            name, args = payload.split(" ", 1)
-            args = args.strip()
-        else:
-            name, args = payload, ""
+        name, _sep, args = payload.partition(" ")
+        args = args.strip()
         command = self.get(name)
         if command is None:
+            suggestions = difflib.get_close_matches(name, self._sorted_names, n=1, cutoff=0.6)
+            if suggestions:
+                return CommandResult(output=f"Unknown command: /{name}. Did you mean /{suggestions[0]}?")
             return CommandResult(output=f"Unknown command: /{name}. Use /help.")
         return command.handler(args)
 
@@ -127,6 +135,9 @@ def create_default_commands(
         extra = parts[1].strip() if len(parts) > 1 else ""
         skill = skills.get(name)
         if skill is None:
+            suggestions = skills.search(name, k=1)
+            if suggestions:
+                return CommandResult(output=f"Skill not found: {name}. Did you mean `{suggestions[0].name}`?")
             return CommandResult(output=f"Skill not found: {name}")
         body = skill.read_text()
         if extra:
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import bisect
 import json
-from collections.abc import Generator, Sequence
+import queue
+import re
+import threading
+from collections.abc import Callable, Generator, Sequence
 from contextlib import contextmanager
+from typing import Any
 
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import CompleteEvent, Completer, Completion
@@ -14,21 +19,72 @@ from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.key_binding import KeyBindings, KeyPressEvent
 from prompt_toolkit.patch_stdout import patch_stdout
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
+from rich.spinner import Spinner
+from rich.text import Text
+
+from apecode.tools import parse_tool_arguments
 
 console = Console()
 
+# ── Background rendering ─────────────────────────────────────────────
+
+
+class BackgroundPrinter:
+    """Render console output on one daemon thread so the agent loop never waits on the terminal."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[tuple[Callable[..., None], tuple[Any, ...]]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., None], *args: Any) -> None:
+        """Queue one render call; calls run in submission order."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._drain, name="apecode-console", daemon=True)
+                    self._thread.start()
+        self._queue.put((fn, args))
+
+    def flush(self) -> None:
+        """Block until every queued render call has finished."""
+        if self._thread is None or threading.current_thread() is self._thread:
+            return
+        self._queue.join()
+
+    def _drain(self) -> None:
+        while True:
+            fn, args = self._queue.get()
+            try:
+                fn(*args)
+            except Exception as exc:  # pragma: no cover - defensive
+                console.print(f"[bold red]error>[/bold red] render failed: {exc}")
+            finally:
+                self._queue.task_done()
+
+
+background = BackgroundPrinter()
+
 # ── Rich output helpers ─────────────────────────────────────────────
 
 
+_LARGE_RESPONSE_CHARS = 4096
+
+
 def print_agent(text: str) -> None:
     """Render agent response as Markdown inside a panel."""
-    console.print(Panel(Markdown(text), title="ape", border_style="green"))
+    background.flush()
+    # The ANSI code theme maps tokens onto the terminal palette, which renders large code blocks noticeably faster
+    markdown = Markdown(text, code_theme="ansi_dark") if len(text) > _LARGE_RESPONSE_CHARS else Markdown(text)
+    console.print(Panel(markdown, title="ape", border_style="green"))
 
 
 def print_error(text: str) -> None:
     """Print an error message in red."""
+    background.flush()
     console.print(f"[bold red]error>[/bold red] {text}")
 
 
@@ -40,24 +96,90 @@ def print_status(text: str) -> None:
 
 # ── Live spinner ─────────────────────────────────────────────────────
 
-_active_spinner = None
+_status_spinner = Spinner("dots", style="status.spinner")
+_status_live: Live | None = None
 
 
 def set_status(text: str) -> None:
-    """Start or stop a live spinner. Empty string stops it."""
-    global _active_spinner
-    if _active_spinner is not None:
-        _active_spinner.__exit__(None, None, None)
-        _active_spinner = None
-    if text:
-        _active_spinner = console.status(f"[bold green]{text}[/bold green]")
-        _active_spinner.__enter__()
+    """Start, relabel or stop the live spinner. Empty string stops it."""
+    global _status_live
+    end_agent_stream()
+    if not text:
+        if _status_live is not None:
+            _status_live.stop()
+            _status_live = None
+        return
+    # Relabelling a running spinner only swaps its text; no new render thread
+    _status_spinner.update(text=Text.from_markup(f"[bold green]{text}[/bold green]"))
+    if _status_live is None:
+        _status_live = Live(_status_spinner, console=console, transient=True, refresh_per_second=12.5)
+        _status_live.start()
+
+
+# ── Streaming preview ────────────────────────────────────────────────
+
+_stream_live: Live | None = None
+_stream_text = Text()
+
+
+def print_agent_stream(token: str) -> None:
+    """Append a streamed token to a transient live panel."""
+    global _stream_live
+    if _status_live is not None:
+        set_status("")
+    if _stream_live is None:
+        _stream_text.plain = ""
+        _stream_live = Live(
+            Panel(_stream_text, title="ape", border_style="green"),
+            console=console,
+            transient=True,
+            refresh_per_second=12,
+        )
+        _stream_live.start()
+    _stream_text.append(token)
+
+
+def end_agent_stream() -> None:
+    """Clear the streaming preview; the final answer is rendered by print_agent."""
+    global _stream_live
+    if _stream_live is not None:
+        _stream_live.stop()
+        _stream_live = None
+
+
+_approval_bindings = KeyBindings()
+
+
+@_approval_bindings.add("<any>")
+def _ignore_key(event: KeyPressEvent) -> None:
+    """Swallow keys other than the answers below."""
+
+
+def _bind_answer(key: str, answer: str) -> None:
+    @_approval_bindings.add(key, eager=True)
+    def _answer(event: KeyPressEvent) -> None:
+        # Echo the answer on the prompt line before returning it
+        event.current_buffer.insert_text(answer)
+        event.app.exit(result=answer)
+
+
+for _key in "yYnNaA":
+    _bind_answer(_key, _key.lower())
+_bind_answer("enter", "n")
+
+_approval_session: PromptSession[str] | None = None
 
 
 def ask_approval(action: str, preview: str) -> bool:
-    """Styled approval prompt for mutating tool calls."""
+    """Styled approval prompt for mutating tool calls; answered with a single key."""
+    global _approval_session
+    background.flush()
+    # prompt_toolkit needs the terminal to itself, so no live region may be redrawing
+    set_status("")
     console.print(Panel(preview, title=f"[yellow]approve: {action}[/yellow]", border_style="yellow"))
-    answer = console.input("[yellow]Approve? [y/N/a=always][/yellow] ").strip().lower()
+    if _approval_session is None:
+        _approval_session = PromptSession(key_bindings=_approval_bindings)
+    answer = _approval_session.prompt(FormattedText([("ansiyellow", "Approve? [y/N/a=always] ")]))
     if answer == "a":
         return True  # caller handles "always" state
     return answer in {"y", "yes", "a"}
@@ -73,27 +195,40 @@ def status_spinner(text: str = "Thinking...") -> Generator[None]:
 # ── Agent event display ──────────────────────────────────────────────
 
 
+_KEY_ARG_NAMES = ("path", "command", "pattern", "plan", "content")
+_KEY_ARG_RE = re.compile(r'"(path|command|pattern|plan|content)"\s*:\s*"([^"\\]{0,60})')
+_KEY_ARG_SCAN_THRESHOLD = 512
+_MISSING = object()
+
+
 def _extract_key_arg(name: str, arguments_json: str) -> str:
     """Pull out the most interesting argument for one-line display."""
+    # Large payloads (file contents, patches) are scanned for a short string value instead of parsed
+    if len(arguments_json) > _KEY_ARG_SCAN_THRESHOLD:
+        found: dict[str, str] = {}
+        for key, value in _KEY_ARG_RE.findall(arguments_json):
+            found.setdefault(key, value)
+        for key in _KEY_ARG_NAMES:
+            if key in found:
+                return found[key]
     try:
-        args = json.loads(arguments_json or "{}")
+        args = parse_tool_arguments(arguments_json)
     except json.JSONDecodeError:
         return ""
     if not isinstance(args, dict):
         return ""
     # Prioritized keys — first match wins
-    for key in ("path", "command", "pattern", "plan", "content"):
-        if key in args:
-            val = args[key]
-            if isinstance(val, str):
-                return val[:60]
-            if isinstance(val, list):
-                return f"[{len(val)} items]"
-    # Fall back to first string value
-    for val in args.values():
+    for key in _KEY_ARG_NAMES:
+        val = args.get(key, _MISSING)
+        if val is _MISSING:
+            continue
         if isinstance(val, str):
             return val[:60]
-    return ""
+        if isinstance(val, list):
+            return f"[{len(val)} items]"
+    # Fall back to first string value
+    first = next((val for val in args.values() if isinstance(val, str)), "")
+    return first[:60]
 
 
 def print_tool_call(name: str, arguments_json: str) -> None:
@@ -103,13 +238,19 @@ def print_tool_call(name: str, arguments_json: str) -> None:
     console.print(f"  [bold blue]> {name}[/bold blue]{suffix}")
 
 
+_PREVIEW_SCAN_CHARS = 4096
+# Leading text of the error strings returned by ToolRegistry.execute and the agent loop
+_ERROR_PREFIXES = ("blocked by", "Rejected", "Unknown tool", "Tool execution failed")
+
+
 def print_tool_result(name: str, result: str) -> None:
     """Show a brief preview of the tool result."""
-    is_error = result.startswith(("blocked by", "Rejected", "Unknown tool", "Tool execution failed"))
+    is_error = result.startswith(_ERROR_PREFIXES)
     marker = "[red]x[/red]" if is_error else "[green]ok[/green]"
-    # Collect first few meaningful lines for preview
+    # Collect first few meaningful lines for preview; only the head of a large result is scanned
     lines: list[str] = []
-    for line in result.splitlines():
+    width = 0
+    for line in result[:_PREVIEW_SCAN_CHARS].splitlines():
         stripped = line.strip()
         if not stripped:
             continue
@@ -119,8 +260,12 @@ def print_tool_result(name: str, result: str) -> None:
                 is_error = True
                 marker = "[red]x[/red]"
             continue
-        lines.append(stripped)
-        if len(lines) >= 3:
+        if lines:
+            width += 3  # " | "
+        # Keep only what fits the 120-char preview; one extra char is enough to trigger the ellipsis
+        lines.append(stripped[: max(120 - width, 0) + 1])
+        width += len(stripped)
+        if len(lines) >= 3 or width > 120:
             break
     preview = " | ".join(lines) if lines else "(empty)"
     if len(preview) > 120:
@@ -159,7 +304,8 @@ class _SlashCompleter(Completer):
     """Auto-complete slash commands typed at the prompt."""
 
     def __init__(self, command_names: Sequence[str]) -> None:
-        self._names = sorted(command_names)
+        # (name, "/name") pairs, sorted so a prefix match is one bisect away
+        self._names = tuple((name, f"/{name}") for name in sorted(command_names))
 
     def get_completions(self, document: Document, complete_event: CompleteEvent):
         text = document.text_before_cursor
@@ -174,18 +320,30 @@ class _SlashCompleter(Completer):
         if last_space >= 0:
             return  # don't complete args, only the command name itself
         token = stripped[1:]  # remove leading "/"
-        for name in self._names:
-            if name.startswith(token):
-                yield Completion(
-                    text=f"/{name}",
-                    start_position=-len(stripped),
-                    display=f"/{name}",
-                )
+        start_position = -len(stripped)
+        names = self._names
+        for index in range(bisect.bisect_left(names, (token,)), len(names)):
+            name, slashed = names[index]
+            if not name.startswith(token):
+                break
+            yield Completion(text=slashed, start_position=start_position, display=slashed)
 
 
 # ── PromptSession wrapper ────────────────────────────────────────────
 
 
+_input_bindings = KeyBindings()
+
+
+@_input_bindings.add("escape", "enter", eager=True)  # Alt+Enter
+@_input_bindings.add("c-j", eager=True)  # Ctrl+J
+def _newline(event: KeyPressEvent) -> None:
+    event.current_buffer.insert_text("\n")
+
+
+_shared_session: PromptSession[str] | None = None
+
+
 class InputSession:
     """Interactive input session backed by prompt_toolkit.
 
@@ -197,22 +355,22 @@ class InputSession:
     """
 
     def __init__(self, command_names: Sequence[str] = ()) -> None:
-        kb = KeyBindings()
-
-        @kb.add("escape", "enter", eager=True)  # Alt+Enter
-        @kb.add("c-j", eager=True)  # Ctrl+J
-        def _newline(event: KeyPressEvent) -> None:
-            event.current_buffer.insert_text("\n")
-
-        self._session: PromptSession[str] = PromptSession(
-            message=FormattedText([("bold ansibrightcyan", "you> ")]),
-            prompt_continuation=FormattedText([("ansigray", " ... ")]),
-            completer=_SlashCompleter(command_names) if command_names else None,
-            complete_while_typing=True,
-            key_bindings=kb,
-            history=InMemoryHistory(),
-            multiline=False,  # Enter submits; Alt+Enter / Ctrl+J for newlines
-        )
+        global _shared_session
+        completer = _SlashCompleter(command_names) if command_names else None
+        # One PromptSession per process; later sessions only swap the completer
+        if _shared_session is None:
+            _shared_session = PromptSession(
+                message=FormattedText([("bold ansibrightcyan", "you> ")]),
+                prompt_continuation=FormattedText([("ansigray", " ... ")]),
+                completer=completer,
+                complete_while_typing=True,
+                key_bindings=_input_bindings,
+                history=InMemoryHistory(),
+                multiline=False,  # Enter submits; Alt+Enter / Ctrl+J for newlines
+            )
+        else:
+            _shared_session.completer = completer
+        self._session: PromptSession[str] = _shared_session
 
     def prompt(self) -> str:
         """Read one user input. Raises EOFError / KeyboardInterrupt."""
@@ -0,0 +1,55 @@
+"""Filesystem helpers shared by the skill, plugin and prompt loaders."""
+
+from __future__ import annotations
+
+import functools
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+
+@functools.lru_cache(maxsize=256)
+def _read_bytes(path: Path, mtime_ns: int, size: int) -> bytes:
+    # mtime_ns and size are only part of the cache key so edited files are re-read
+    _ = mtime_ns, size
+    return path.read_bytes()
+
+
+def read_cached(path: Path) -> bytes:
+    """Read a file's bytes, reusing the previous read while its mtime and size are unchanged."""
+    stat = path.stat()
+    return _read_bytes(path, stat.st_mtime_ns, stat.st_size)
+
+
+def read_cached_text(path: Path) -> str:
+    """Like read_cached, decoded as UTF-8 with the newline translation Path.read_text applies."""
+    text = read_cached(path).decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def sorted_entries(directory: Path) -> list[os.DirEntry[str]]:
+    """List a directory's entries sorted by name."""
+    # DirEntry.is_dir() reuses the d_type from readdir, so callers filtering on it skip a stat per entry
+    with os.scandir(directory) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+def find_in_subdirs(roots: Iterable[Path], file_name: str) -> list[Path]:
+    """Find file_name directly in each root and in its immediate subdirectories, in name order."""
+    found: list[Path] = []
+    for root in roots:
+        normalized = root.expanduser().resolve()
+        if not normalized.is_dir():
+            continue
+
+        direct = normalized / file_name
+        if direct.is_file():
+            found.append(direct)
+
+        for entry in sorted_entries(normalized):
+            if not entry.is_dir():
+                continue
+            nested = os.path.join(entry.path, file_name)
+            if os.path.isfile(nested):
+                found.append(Path(nested))
+    return found
@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
 import json
 import re
+import threading
+from collections.abc import Coroutine
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -13,9 +17,11 @@ from fastmcp import Client
 
 from apecode.tools import Tool, ToolRegistry
 
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9_]+")
+
 
 def _sanitize_name(value: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_]+", "_", value).strip("_").lower() or "tool"
+    return _SANITIZE_RE.sub("_", value).strip("_").lower() or "tool"
 
 
 @dataclass(frozen=True, slots=True)
@@ -24,24 +30,86 @@ class McpServerConfig:
 
     name: str
     command: str
-    args: list[str] = field(default_factory=list)
+    args: tuple[str, ...] = ()
     timeout_sec: int = 30
 
 
 @dataclass(slots=True)
 class McpBridge:
-    """Loaded MCP registration result."""
+    """Loaded MCP registration result and the live server sessions behind it.
+
+    One fastmcp ``Client`` stays connected per server, driven by a private
+    event loop on a daemon thread, so tool calls reuse the stdio process
+    instead of spawning it and redoing the handshake each time.
+    """
 
     tool_names: list[str] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
+    _clients: dict[str, Client] = field(default_factory=dict, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, repr=False)
+    _thread: threading.Thread | None = field(default=None, repr=False)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="apecode-mcp", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, Any], *, timeout: float | None) -> Any:
+        """Run a coroutine on the bridge loop and block until it finishes."""
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coro, timeout=timeout), self._ensure_loop())
+        return future.result()
+
+    async def _open(self, server: McpServerConfig) -> list[Any]:
+        client = _make_client(server)
+        # Registered before connecting so a failed handshake is still cleaned up by disconnect()
+        self._clients[server.name] = client
+        await client.__aenter__()
+        return await client.list_tools()
+
+    def discover(self, servers: list[McpServerConfig]) -> list[list[Any] | BaseException]:
+        """Connect to all servers concurrently and list their tools; failures are returned in place."""
+
+        async def _gather() -> list[list[Any] | BaseException]:
+            return await asyncio.gather(
+                *(asyncio.wait_for(self._open(server), timeout=server.timeout_sec) for server in servers),
+                return_exceptions=True,
+            )
+
+        return self.run(_gather(), timeout=None)
+
+    def call_tool(self, server: McpServerConfig, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Call one tool over the server's open session."""
+        return self.run(self._clients[server.name].call_tool(tool_name, arguments), timeout=server.timeout_sec)
+
+    def disconnect(self, name: str) -> None:
+        client = self._clients.pop(name, None)
+        if client is None or self._loop is None:
+            return
+        # Best-effort shutdown: a dead server must not block closing the rest
+        with contextlib.suppress(Exception):
+            self.run(client.close(), timeout=10)
 
     def close(self) -> None:
-        """No-op: sessions are opened per request in this nano implementation."""
+        """Close every server session and stop the background loop."""
+        for name in list(self._clients):
+            self.disconnect(name)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            # A loop still running (e.g. a hung server close) cannot be closed; the daemon thread is left to exit with the process
+            if self._thread is None or not self._thread.is_alive():
+                self._loop.close()
+            self._loop = None
+            self._thread = None
 
 
 def _parse_mcp_config(path: Path) -> list[McpServerConfig]:
     """Parse `.mcp.json` with `mcpServers` entries."""
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    # json.loads decodes UTF-8 bytes itself, skipping the intermediate str copy
+    payload = json.loads(path.read_bytes())
     servers: list[McpServerConfig] = []
 
     raw_mcp_servers = payload.get("mcpServers")
@@ -53,7 +121,7 @@ def _parse_mcp_config(path: Path) -> list[McpServerConfig]:
             if not command:
                 continue
             raw_args = item.get("args", [])
-            args = [str(value) for value in raw_args] if isinstance(raw_args, list) else []
+            args = tuple(str(value) for value in raw_args) if isinstance(raw_args, list) else ()
             timeout_sec = max(5, min(int(item.get("timeout_sec", 30)), 300))
             servers.append(
                 McpServerConfig(
@@ -67,38 +135,34 @@ def _parse_mcp_config(path: Path) -> list[McpServerConfig]:
     return servers
 
 
-def _make_client(server: McpServerConfig) -> Client:
-    """Create a fastmcp Client for a single MCP server."""
-    config = {"mcpServers": {server.name: {"command": server.command, "args": server.args}}}
-    return Client(config)
-
-
-async def _list_tools_async(server: McpServerConfig) -> list[Any]:
-    async with _make_client(server) as client:
-        return await client.list_tools()
+@functools.cache
+def _client_config(server: McpServerConfig) -> dict[str, Any]:
+    # Server configs are frozen and hashable, so reconnects reuse the same dict
+    return {"mcpServers": {server.name: {"command": server.command, "args": list(server.args)}}}
 
 
-async def _call_tool_async(server: McpServerConfig, tool_name: str, arguments: dict[str, Any]) -> Any:
-    async with _make_client(server) as client:
-        return await client.call_tool(tool_name, arguments)
+def _make_client(server: McpServerConfig) -> Client:
+    """Create a fastmcp Client for a single MCP server."""
+    return Client(_client_config(server))
 
 
 def _render_tool_result(result: Any, *, server_name: str, tool_name: str) -> str:
     is_error = bool(getattr(result, "isError", False) or getattr(result, "is_error", False))
-    content = list(getattr(result, "content", []) or [])
+    dumps = json.dumps
 
     chunks: list[str] = []
-    for item in content:
-        item_type = str(getattr(item, "type", ""))
-        if item_type == "text":
-            text = str(getattr(item, "text", ""))
-            if text:
-                chunks.append(text)
-            continue
-        if hasattr(item, "model_dump"):
-            chunks.append(json.dumps(item.model_dump(mode="json"), ensure_ascii=False))
-        else:
-            chunks.append(str(item))
+    for item in getattr(result, "content", None) or ():
+        # MCP content blocks are typed models, so direct access is the common path
+        try:
+            if item.type == "text":
+                text = str(item.text)
+                if text:
+                    chunks.append(text)
+                continue
+        except AttributeError:
+            pass
+        model_dump = getattr(item, "model_dump", None)
+        chunks.append(dumps(model_dump(mode="json"), ensure_ascii=False) if model_dump is not None else str(item))
 
     rendered = "\n".join(part for part in chunks if part.strip()).strip()
     if not rendered:
@@ -113,65 +177,65 @@ def load_mcp_tools(registry: ToolRegistry, config_paths: list[Path]) -> McpBridg
     bridge = McpBridge()
     seen_servers: set[str] = set()
 
+    servers: list[McpServerConfig] = []
     for raw_path in config_paths:
         path = raw_path.expanduser().resolve()
         if not path.exists() or not path.is_file():
             continue
         try:
-            servers = _parse_mcp_config(path)
+            parsed = _parse_mcp_config(path)
         except Exception as exc:
             bridge.errors.append(f"invalid MCP config `{path}`: {exc}")
             continue
-
-        for server in servers:
+        for server in parsed:
             if server.name in seen_servers:
                 continue
             seen_servers.add(server.name)
-            try:
-                tools = asyncio.run(asyncio.wait_for(_list_tools_async(server), timeout=server.timeout_sec))
-            except Exception as exc:
-                bridge.errors.append(f"MCP server `{server.name}` unavailable: {exc}")
+            servers.append(server)
+    if not servers:
+        return bridge
+
+    # Handshakes are pipe-bound, so all servers start up concurrently
+    for server, outcome in zip(servers, bridge.discover(servers), strict=True):
+        if isinstance(outcome, BaseException):
+            bridge.disconnect(server.name)
+            bridge.errors.append(f"MCP server `{server.name}` unavailable: {outcome}")
+            continue
+
+        for raw_tool in outcome:
+            raw_name = str(getattr(raw_tool, "name", "")).strip()
+            if not raw_name:
                 continue
 
-            for raw_tool in tools:
-                raw_name = str(getattr(raw_tool, "name", "")).strip()
-                if not raw_name:
-                    continue
-
-                namespaced = f"mcp__{_sanitize_name(server.name)}__{_sanitize_name(raw_name)}"
-                description = str(getattr(raw_tool, "description", "")).strip()
-                schema = getattr(raw_tool, "inputSchema", None)
-                if not isinstance(schema, dict):
-                    schema = {"type": "object", "properties": {}}
-
-                annotations = getattr(raw_tool, "annotations", None)
-                read_only = bool(getattr(annotations, "readOnlyHint", False)) if annotations else False
-
-                def _handler(_ctx, args, *, _server=server, _tool_name=raw_name):
-                    try:
-                        result = asyncio.run(
-                            asyncio.wait_for(
-                                _call_tool_async(_server, _tool_name, args),
-                                timeout=_server.timeout_sec,
-                            )
-                        )
-                    except Exception as exc:
-                        return f"MCP `{_server.name}/{_tool_name}` invocation error: {exc}"
-                    return _render_tool_result(
-                        result,
-                        server_name=_server.name,
-                        tool_name=_tool_name,
-                    )
-
-                registry.register(
-                    Tool(
-                        name=namespaced,
-                        description=description or f"[mcp:{server.name}] call MCP tool `{raw_name}`",
-                        parameters=schema,
-                        handler=_handler,
-                        mutating=not read_only,
-                    )
+            namespaced = f"mcp__{_sanitize_name(server.name)}__{_sanitize_name(raw_name)}"
+            description = str(getattr(raw_tool, "description", "")).strip()
+            schema = getattr(raw_tool, "inputSchema", None)
+            if not isinstance(schema, dict):
+                schema = {"type": "object", "properties": {}}
+
+            annotations = getattr(raw_tool, "annotations", None)
+            read_only = bool(getattr(annotations, "readOnlyHint", False)) if annotations else False
+
+            def _handler(_ctx, args, *, _server=server, _tool_name=raw_name):
+                try:
+                    result = bridge.call_tool(_server, _tool_name, args)
+                except Exception as exc:
+                    return f"MCP `{_server.name}/{_tool_name}` invocation error: {exc}"
+                return _render_tool_result(
+                    result,
+                    server_name=_server.name,
+                    tool_name=_tool_name,
                 )
-                bridge.tool_names.append(namespaced)
+
+            registry.register(
+                Tool(
+                    name=namespaced,
+                    description=description or f"[mcp:{server.name}] call MCP tool `{raw_name}`",
+                    parameters=schema,
+                    handler=_handler,
+                    mutating=not read_only,
+                )
+            )
+            bridge.tool_names.append(namespaced)
 
     return bridge
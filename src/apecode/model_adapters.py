@@ -2,38 +2,60 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Any
 
+from apecode.tools import parse_tool_arguments
+
 
 class ModelError(RuntimeError):
     """Raised when model calls fail."""
 
 
 def _coerce_text_content(content: Any) -> str:
+    # Exact type checks: plain str content is by far the common case
+    content_type = type(content)
+    if content_type is str:
+        return content
     if content is None:
         return ""
-    if isinstance(content, str):
-        return content
-    if isinstance(content, list):
-        parts: list[str] = []
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                parts.append(str(item.get("text", "")))
-        return "".join(parts)
+    if content_type is list:
+        return "".join(str(item.get("text", "")) for item in content if type(item) is dict and item.get("type") == "text")
     return str(content)
 
 
+def _tool_use_block(tool_call: dict[str, Any]) -> dict[str, Any]:
+    function = tool_call.get("function") or {}
+    raw_arguments = function.get("arguments", "{}")
+    # History is re-converted every turn, so the same argument strings recur
+    try:
+        tool_input = parse_tool_arguments(str(raw_arguments))
+    except json.JSONDecodeError:
+        tool_input = {"_raw_arguments": str(raw_arguments)}
+    if not isinstance(tool_input, dict):
+        tool_input = {"value": tool_input}
+    return {
+        "type": "tool_use",
+        "id": str(tool_call.get("id", "")),
+        "name": str(function.get("name", "")),
+        "input": tool_input,
+    }
+
+
 def _openai_messages_to_anthropic(messages: list[dict[str, Any]]) -> tuple[str, list[dict[str, Any]]]:
     system_parts: list[str] = []
     converted: list[dict[str, Any]] = []
+    # Local binding: this runs over the whole history on every request
+    coerce = _coerce_text_content
 
     for message in messages:
         role = message.get("role")
         if role == "system":
-            text = _coerce_text_content(message.get("content"))
+            text = coerce(message.get("content"))
             if text:
                 system_parts.append(text)
             continue
@@ -42,36 +64,16 @@ def _openai_messages_to_anthropic(messages: list[dict[str, Any]]) -> tuple[str,
             converted.append(
                 {
                     "role": "user",
-                    "content": [{"type": "text", "text": _coerce_text_content(message.get("content"))}],
+                    "content": [{"type": "text", "text": coerce(message.get("content"))}],
                 }
             )
             continue
 
         if role == "assistant":
-            blocks: list[dict[str, Any]] = []
-            text = _coerce_text_content(message.get("content"))
-            if text:
-                blocks.append({"type": "text", "text": text})
-            for tool_call in message.get("tool_calls") or []:
-                function = tool_call.get("function") or {}
-                raw_arguments = function.get("arguments", "{}")
-                try:
-                    tool_input = json.loads(raw_arguments)
-                except json.JSONDecodeError:
-                    tool_input = {"_raw_arguments": str(raw_arguments)}
-                if not isinstance(tool_input, dict):
-                    tool_input = {"value": tool_input}
-                blocks.append(
-                    {
-                        "type": "tool_use",
-                        "id": str(tool_call.get("id", "")),
-                        "name": str(function.get("name", "")),
-                        "input": tool_input,
-                    }
-                )
-            if not blocks:
-                blocks.append({"type": "text", "text": ""})
-            converted.append({"role": "assistant", "content": blocks})
+            text = coerce(message.get("content"))
+            blocks = [{"type": "text", "text": text}] if text else []
+            blocks += [_tool_use_block(tool_call) for tool_call in message.get("tool_calls") or ()]
+            converted.append({"role": "assistant", "content": blocks or [{"type": "text", "text": ""}]})
             continue
 
         if role == "tool":
@@ -82,7 +84,7 @@ def _openai_messages_to_anthropic(messages: list[dict[str, Any]]) -> tuple[str,
                         {
                             "type": "tool_result",
                             "tool_use_id": str(message.get("tool_call_id", "")),
-                            "content": _coerce_text_content(message.get("content")),
+                            "content": coerce(message.get("content")),
                         }
                     ],
                 }
@@ -92,46 +94,51 @@ def _openai_messages_to_anthropic(messages: list[dict[str, Any]]) -> tuple[str,
 
 
 def _openai_tools_to_anthropic(tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    converted: list[dict[str, Any]] = []
-    for tool in tools:
-        function = tool.get("function") or {}
-        converted.append(
-            {
-                "name": function.get("name", ""),
-                "description": function.get("description", ""),
-                "input_schema": function.get("parameters", {"type": "object", "properties": {}}),
-            }
-        )
-    return converted
-
-
-def _anthropic_message_to_openai(message: dict[str, Any]) -> dict[str, Any]:
-    content = message.get("content") or []
-    text_parts: list[str] = []
-    tool_calls: list[dict[str, Any]] = []
-    for block in content:
-        if not isinstance(block, dict):
-            continue
-        if block.get("type") == "text":
-            text_parts.append(str(block.get("text", "")))
-            continue
-        if block.get("type") == "tool_use":
-            tool_calls.append(
-                {
-                    "id": str(block.get("id", "")),
-                    "type": "function",
-                    "function": {
-                        "name": str(block.get("name", "")),
-                        "arguments": json.dumps(block.get("input", {}), ensure_ascii=False),
-                    },
-                }
-            )
-    result: dict[str, Any] = {"role": "assistant", "content": "".join(text_parts)}
+    functions = [tool.get("function") or {} for tool in tools]
+    return [
+        {
+            "name": function.get("name", ""),
+            "description": function.get("description", ""),
+            "input_schema": function.get("parameters", {"type": "object", "properties": {}}),
+        }
+        for function in functions
+    ]
+
+
+def _anthropic_message_to_openai(message: Any) -> dict[str, Any]:
+    blocks = getattr(message, "content", None) or ()
+    dumps = json.dumps
+    text = "".join(str(block.text) for block in blocks if block.type == "text")
+    tool_calls = [
+        {
+            "id": str(block.id),
+            "type": "function",
+            "function": {
+                "name": str(block.name),
+                "arguments": dumps(block.input or {}, ensure_ascii=False),
+            },
+        }
+        for block in blocks
+        if block.type == "tool_use"
+    ]
+    result: dict[str, Any] = {"role": "assistant", "content": text}
     if tool_calls:
         result["tool_calls"] = tool_calls
     return result
 
 
+def _openai_tool_call_to_dict(item: Any) -> dict[str, Any]:
+    function = getattr(item, "function", None)
+    return {
+        "id": str(getattr(item, "id", "")),
+        "type": "function",
+        "function": {
+            "name": str(getattr(function, "name", "")),
+            "arguments": str(getattr(function, "arguments", "{}")),
+        },
+    }
+
+
 def _openai_message_to_dict(message: Any) -> dict[str, Any]:
     content = message.content if hasattr(message, "content") else ""
     result: dict[str, Any] = {"role": "assistant", "content": content or ""}
@@ -139,25 +146,42 @@ def _openai_message_to_dict(message: Any) -> dict[str, Any]:
     reasoning_content = getattr(message, "reasoning_content", None)
     if reasoning_content:
         result["reasoning_content"] = reasoning_content
-    raw_tool_calls = list(getattr(message, "tool_calls", None) or [])
+    raw_tool_calls = getattr(message, "tool_calls", None)
     if raw_tool_calls:
-        normalized_calls: list[dict[str, Any]] = []
-        for item in raw_tool_calls:
-            function = getattr(item, "function", None)
-            normalized_calls.append(
-                {
-                    "id": str(getattr(item, "id", "")),
-                    "type": "function",
-                    "function": {
-                        "name": str(getattr(function, "name", "")),
-                        "arguments": str(getattr(function, "arguments", "{}")),
-                    },
-                }
-            )
-        result["tool_calls"] = normalized_calls
+        result["tool_calls"] = [_openai_tool_call_to_dict(item) for item in raw_tool_calls]
     return result
 
 
+def _openai_chunk_to_delta(chunk: Any) -> dict[str, Any] | None:
+    choices = getattr(chunk, "choices", None) or []
+    if not choices:
+        return None
+    choice = choices[0]
+    delta = getattr(choice, "delta", None)
+    tool_calls_delta: list[dict[str, Any]] = []
+    for item in getattr(delta, "tool_calls", None) or []:
+        function = getattr(item, "function", None)
+        tool_calls_delta.append(
+            {
+                "index": getattr(item, "index", 0),
+                "id": getattr(item, "id", None) or "",
+                "function": {
+                    "name": getattr(function, "name", None) or "",
+                    "arguments": getattr(function, "arguments", None) or "",
+                },
+            }
+        )
+    return {
+        "content_delta": getattr(delta, "content", None) or "",
+        # Preserve reasoning_content for thinking models (e.g. Kimi K2.5)
+        "reasoning_delta": getattr(delta, "reasoning_content", None) or "",
+        "tool_calls_delta": tool_calls_delta,
+        "finish_reason": getattr(choice, "finish_reason", None),
+    }
+
+
+# Cached: the import statement is otherwise re-run on every request
+@functools.cache
 def _require_openai_sdk():
     try:
         from openai import APIConnectionError, APIError, APITimeoutError, OpenAI
@@ -166,6 +190,7 @@ def _require_openai_sdk():
     return OpenAI, APIError, APIConnectionError, APITimeoutError
 
 
+@functools.cache
 def _require_anthropic_sdk():
     try:
         from anthropic import Anthropic, APIConnectionError, APIError, APITimeoutError
@@ -184,15 +209,21 @@ class OpenAIChatCompletionsClient:
     timeout: int = 120
     temperature: float = 0.0
     _client: Any = field(init=False, repr=False)
+    _errors: tuple[type[Exception], ...] = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
-        OpenAI, _api_error, _conn_error, _timeout_error = _require_openai_sdk()
+        OpenAI, *errors = _require_openai_sdk()
+        self._errors = tuple(errors)
         self._client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
             timeout=self.timeout,
         )
 
+    def close(self) -> None:
+        """Release pooled HTTP connections held by the SDK client."""
+        self._client.close()
+
     def complete(
         self,
         *,
@@ -200,7 +231,7 @@ class OpenAIChatCompletionsClient:
         tools: list[dict[str, Any]],
     ) -> dict[str, Any]:
         """Send one completion request and return one assistant message."""
-        _OpenAI, APIError, APIConnectionError, APITimeoutError = _require_openai_sdk()
+        APIError, APIConnectionError, APITimeoutError = self._errors
         try:
             response = self._client.chat.completions.create(
                 model=self.model,
@@ -224,6 +255,36 @@ class OpenAIChatCompletionsClient:
             raise ModelError(f"Unexpected model response: {response}") from exc
         return _openai_message_to_dict(message)
 
+    def stream(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+    ) -> Iterator[dict[str, Any]]:
+        """Send one streaming completion request and yield assistant deltas."""
+        APIError, APIConnectionError, APITimeoutError = self._errors
+        try:
+            response = self._client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                temperature=self.temperature,
+                stream=True,
+            )
+            for chunk in response:
+                delta = _openai_chunk_to_delta(chunk)
+                if delta is not None:
+                    yield delta
+        except APITimeoutError as exc:
+            raise ModelError("Request timed out") from exc
+        except APIConnectionError as exc:
+            raise ModelError(f"Network error: {exc}") from exc
+        except APIError as exc:
+            raise ModelError(f"Provider error: {exc}") from exc
+        except Exception as exc:  # pragma: no cover - defensive
+            raise ModelError(f"Unexpected OpenAI SDK error: {exc}") from exc
+
 
 @dataclass(slots=True)
 class AnthropicMessagesClient:
@@ -237,9 +298,12 @@ class AnthropicMessagesClient:
     max_tokens: int = 4096
     temperature: float = 0.0
     _client: Any = field(init=False, repr=False)
+    _errors: tuple[type[Exception], ...] = field(init=False, repr=False)
+    _tools_cache: tuple[list[dict[str, Any]], list[dict[str, Any]]] | None = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
-        Anthropic, _api_error, _conn_error, _timeout_error = _require_anthropic_sdk()
+        Anthropic, *errors = _require_anthropic_sdk()
+        self._errors = tuple(errors)
         self._client = Anthropic(
             api_key=self.api_key,
             base_url=self.base_url,
@@ -247,6 +311,21 @@ class AnthropicMessagesClient:
             default_headers={"anthropic-version": self.api_version},
         )
 
+    def close(self) -> None:
+        """Release pooled HTTP connections held by the SDK client."""
+        self._client.close()
+
+    def _anthropic_tools(self, tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # The agent hands over the same schema list until the registry changes;
+        # holding it keeps the identity check valid
+        if self._tools_cache is None or self._tools_cache[0] is not tools:
+            converted = _openai_tools_to_anthropic(tools)
+            # Tools lead the cached prefix; a breakpoint on the last one caches the whole list
+            if converted:
+                converted[-1] = {**converted[-1], "cache_control": {"type": "ephemeral"}}
+            self._tools_cache = (tools, converted)
+        return self._tools_cache[1]
+
     def complete(
         self,
         *,
@@ -259,12 +338,14 @@ class AnthropicMessagesClient:
             "messages": anthropic_messages,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
-            "tools": _openai_tools_to_anthropic(tools),
+            "tools": self._anthropic_tools(tools),
         }
+        # Prompt-cache breakpoints sit only on the stable prefix (tools, then system);
+        # the newest message changes every request, so caching it would be written and never read
         if system_prompt:
-            payload["system"] = system_prompt
+            payload["system"] = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
 
-        _Anthropic, APIError, APIConnectionError, APITimeoutError = _require_anthropic_sdk()
+        APIError, APIConnectionError, APITimeoutError = self._errors
         try:
             response = self._client.messages.create(**payload)
         except APITimeoutError as exc:
@@ -276,10 +357,11 @@ class AnthropicMessagesClient:
         except Exception as exc:  # pragma: no cover - defensive
             raise ModelError(f"Unexpected Anthropic SDK error: {exc}") from exc
 
-        body = response.model_dump(mode="json", exclude_none=True)
-        if not isinstance(body, dict):
-            raise ModelError(f"Unexpected model response: {response}")
-        return _anthropic_message_to_openai(body)
+        # Read the SDK message directly rather than dumping the whole model to a dict
+        try:
+            return _anthropic_message_to_openai(response)
+        except (AttributeError, TypeError) as exc:
+            raise ModelError(f"Unexpected model response: {response}") from exc
 
 
 @dataclass(slots=True)
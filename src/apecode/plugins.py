@@ -2,41 +2,27 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import re
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
-from apecode.skills import Skill
-from apecode.tools import Tool, ToolContext, ToolRegistry
+from apecode.fs import find_in_subdirs, read_cached
+from apecode.skills import Skill, _extract_description, _read_prefix
+from apecode.tools import UTF8_MAX_CHAR_BYTES, Tool, ToolContext, ToolRegistry, run_capped
 
 PLUGIN_MANIFEST_NAME = "apecode_plugin.json"
 
 
-def _sanitize_name(value: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_]+", "_", value).strip("_").lower() or "item"
-
-
-def _iter_manifest_files(plugin_dirs: list[Path]) -> list[Path]:
-    manifests: list[Path] = []
-    for raw_dir in plugin_dirs:
-        plugin_dir = raw_dir.expanduser().resolve()
-        if not plugin_dir.exists() or not plugin_dir.is_dir():
-            continue
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9_]+")
 
-        direct_manifest = plugin_dir / PLUGIN_MANIFEST_NAME
-        if direct_manifest.exists() and direct_manifest.is_file():
-            manifests.append(direct_manifest)
 
-        for child in sorted(plugin_dir.iterdir()):
-            if not child.is_dir():
-                continue
-            nested_manifest = child / PLUGIN_MANIFEST_NAME
-            if nested_manifest.exists() and nested_manifest.is_file():
-                manifests.append(nested_manifest)
-    return manifests
+@functools.lru_cache(maxsize=256)
+def _sanitize_name(value: str) -> str:
+    return _SANITIZE_RE.sub("_", value).strip("_").lower() or "item"
 
 
 @dataclass(frozen=True, slots=True)
@@ -50,7 +36,7 @@ class PluginToolSpec:
     mutating: bool
     timeout_sec: int
     command: str | None = None
-    argv: list[str] | None = None
+    argv: tuple[str, ...] | None = None
     workdir: Path | None = None
 
 
@@ -105,7 +91,7 @@ def _parse_tools(payload: dict[str, Any], *, manifest_path: Path, plugin_name: s
 
         command = str(item.get("command", "")).strip() or None
         argv_value = item.get("argv")
-        argv = [str(value) for value in argv_value] if isinstance(argv_value, list) else None
+        argv = tuple(str(value) for value in argv_value) if isinstance(argv_value, list) else None
         if not command and not argv:
             raise ValueError(f"tool `{name}` must provide `command` or `argv`")
         if command and argv:
@@ -181,18 +167,14 @@ def _parse_skills(payload: dict[str, Any], *, manifest_path: Path, plugin_name:
             content_text = inline_content.strip()
         elif file_path:
             path = (manifest_path.parent / file_path).resolve()
-            if not path.exists() or not path.is_file():
+            if not path.is_file():
                 raise ValueError(f"skill `{name}` file not found: {file_path}")
-            content_text = path.read_text(encoding="utf-8", errors="replace").strip()
+            # Only the head is needed for the description; Skill.read_text loads the body on demand
+            content_text = _read_prefix(path)
         else:
             raise ValueError(f"skill `{name}` requires `content` or `file`")
 
-        derived_description = "No description."
-        for raw_line in content_text.splitlines():
-            line = raw_line.strip()
-            if line and not line.startswith("#"):
-                derived_description = line[:160]
-                break
+        derived_description = _extract_description(content_text)
 
         skills.append(
             Skill(
@@ -207,7 +189,7 @@ def _parse_skills(payload: dict[str, Any], *, manifest_path: Path, plugin_name:
 
 
 def _parse_manifest(manifest_path: Path) -> _ParsedManifest:
-    payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    payload = json.loads(read_cached(manifest_path))
     if not isinstance(payload, dict):
         raise ValueError("manifest root must be an object")
     plugin_name = str(payload.get("name", manifest_path.parent.name)).strip() or manifest_path.parent.name
@@ -219,34 +201,42 @@ def _parse_manifest(manifest_path: Path) -> _ParsedManifest:
     )
 
 
+_OUTPUT_LIMIT_CHARS = 8000
+_OUTPUT_LIMIT_BYTES = UTF8_MAX_CHAR_BYTES * _OUTPUT_LIMIT_CHARS
+
+
+def _try_parse_manifest(manifest_path: Path) -> _ParsedManifest | Exception:
+    try:
+        return _parse_manifest(manifest_path)
+    except Exception as exc:
+        return exc
+
+
 def _build_tool_handler(spec: PluginToolSpec):
-    def _handler(_ctx: ToolContext, args: dict[str, Any]) -> str:
-        if spec.argv:
-            command: str | list[str] = spec.argv
-            shell = False
-        else:
-            command = spec.command or ""
-            shell = True
+    # The spec is frozen, so the command is settled once rather than on every call
+    command: str | tuple[str, ...] = spec.argv or spec.command or ""
+    shell = not spec.argv
 
-        proc = subprocess.run(
+    def _handler(_ctx: ToolContext, args: dict[str, Any]) -> str:
+        run = run_capped(
             command,
             shell=shell,
             cwd=spec.workdir,
-            input=json.dumps(args, ensure_ascii=False),
-            capture_output=True,
-            text=True,
             timeout=spec.timeout_sec,
-            check=False,
+            limit=_OUTPUT_LIMIT_BYTES,
+            # Compact separators: the payload is for a program, not a reader
+            input_data=json.dumps(args, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
         )
-        output = (proc.stdout or "").strip()
-        error_text = (proc.stderr or "").strip()
-        if proc.returncode != 0:
-            detail = error_text or output or f"exit_code={proc.returncode}"
+        returncode, truncated = run.returncode, run.truncated
+        output = run.stdout.decode("utf-8", errors="replace").strip()
+        error_text = run.stderr.decode("utf-8", errors="replace").strip()
+        if returncode != 0:
+            detail = error_text or output or f"exit_code={returncode}"
             return f"plugin `{spec.plugin_name}` tool `{spec.name}` failed: {detail}"
         if not output:
             return f"plugin `{spec.plugin_name}` tool `{spec.name}` finished with empty output"
-        if len(output) > 8000:
-            return output[:8000] + "\n... (truncated)"
+        if truncated or len(output) > _OUTPUT_LIMIT_CHARS:
+            return output[:_OUTPUT_LIMIT_CHARS] + "\n... (truncated)"
         return output
 
     return _handler
@@ -255,18 +245,20 @@ def _build_tool_handler(spec: PluginToolSpec):
 def load_plugins(registry: ToolRegistry, plugin_dirs: list[Path]) -> PluginLoadResult:
     """Load plugins and register declarative plugin tools."""
     result = PluginLoadResult()
-    existing_tool_names = set(registry.list_tool_names())
-
-    for manifest in _iter_manifest_files(plugin_dirs):
-        try:
-            parsed = _parse_manifest(manifest)
-        except Exception as exc:
-            result.errors.append(f"invalid plugin manifest `{manifest}`: {exc}")
+    manifests = find_in_subdirs(plugin_dirs, PLUGIN_MANIFEST_NAME)
+    # Manifests are independent files, so read and parse them concurrently;
+    # registration below stays sequential and in discovery order
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(manifests)))) as pool:
+        outcomes = list(pool.map(_try_parse_manifest, manifests))
+
+    for manifest, parsed in zip(manifests, outcomes, strict=True):
+        if isinstance(parsed, Exception):
+            result.errors.append(f"invalid plugin manifest `{manifest}`: {parsed}")
             continue
 
         for spec in parsed.tools:
             namespaced = f"{_sanitize_name(spec.plugin_name)}__{_sanitize_name(spec.name)}"
-            if namespaced in existing_tool_names:
+            if namespaced in registry:
                 result.errors.append(f"duplicate plugin tool ignored: {namespaced}")
                 continue
             registry.register(
@@ -278,7 +270,6 @@ def load_plugins(registry: ToolRegistry, plugin_dirs: list[Path]) -> PluginLoadR
                     mutating=spec.mutating,
                 )
             )
-            existing_tool_names.add(namespaced)
             result.tool_names.append(namespaced)
 
         result.commands.extend(parsed.commands)
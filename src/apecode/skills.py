@@ -2,13 +2,26 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from dataclasses import dataclass
+import difflib
+import heapq
+import operator
+import re
+from collections import ChainMap
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
+from apecode.fs import find_in_subdirs, read_cached, read_cached_text
+
 SKILL_FILE_NAME = "SKILL.md"
 
 
+def _read_prefix(path: Path, size: int = 4096) -> str:
+    """Read the head of a file, enough to derive a skill description."""
+    with path.open("rb") as handle:
+        return handle.read(size).decode("utf-8", errors="replace")
+
+
 @dataclass(frozen=True, slots=True)
 class Skill:
     """One discovered skill."""
@@ -25,45 +38,32 @@ class Skill:
             return self.inline_content.strip()
         if self.path is None:
             return ""
-        return self.path.read_text(encoding="utf-8", errors="replace").strip()
+        return read_cached_text(self.path).strip()
+
+
+# First line that is neither blank nor a markdown heading
+_DESCRIPTION_RE = re.compile(r"^\s*([^#\s].*)", re.MULTILINE)
 
 
 def _extract_description(text: str) -> str:
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        if line.startswith("#"):
-            continue
-        return line[:160]
-    return "No description."
-
-
-def _iter_skill_files(roots: Iterable[Path]) -> list[Path]:
-    discovered: list[Path] = []
-    for root in roots:
-        normalized = root.expanduser().resolve()
-        if not normalized.exists() or not normalized.is_dir():
-            continue
-
-        direct = normalized / SKILL_FILE_NAME
-        if direct.exists() and direct.is_file():
-            discovered.append(direct)
-
-        for child in sorted(normalized.iterdir()):
-            if not child.is_dir():
-                continue
-            nested = child / SKILL_FILE_NAME
-            if nested.exists() and nested.is_file():
-                discovered.append(nested)
-    return discovered
+    match = _DESCRIPTION_RE.search(text)
+    return match.group(1).rstrip()[:160] if match else "No description."
+
+
+def _skill_description(path: Path) -> str:
+    # The description comes from the head of the file, as with _read_prefix
+    return _extract_description(read_cached(path)[:4096].decode("utf-8", errors="replace"))
 
 
 @dataclass(slots=True)
 class SkillCatalog:
     """In-memory skill index."""
 
-    _skills: dict[str, Skill]
+    _skills: Mapping[str, Skill]
+    # Rendered views, filled on first use; the index never changes after construction
+    _sorted: tuple[Skill, ...] | None = field(default=None, init=False, repr=False, compare=False)
+    _overview: str | None = field(default=None, init=False, repr=False, compare=False)
+    _system_prompt_block: str | None = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
     def _normalize_name(name: str) -> str:
@@ -72,54 +72,74 @@ class SkillCatalog:
     @classmethod
     def from_roots(cls, roots: Iterable[Path]) -> SkillCatalog:
         indexed: dict[str, Skill] = {}
-        for path in _iter_skill_files(roots):
+        for path in find_in_subdirs(roots, SKILL_FILE_NAME):
             if path.parent.name.lower() == ".system":
                 continue
             name = cls._normalize_name(path.parent.name)
             if name in indexed:
                 continue
-            content = path.read_text(encoding="utf-8", errors="replace")
+            # The full body is read lazily by Skill.read_text; rebuilding a catalog only stats unchanged files
             indexed[name] = Skill(
                 name=name,
-                description=_extract_description(content),
+                description=_skill_description(path),
                 path=path,
                 source=f"file:{path}",
             )
-        return cls(_skills=indexed)
+        ordered = dict(sorted(indexed.items()))
+        catalog = cls(_skills=ordered)
+        # Already in name order, so the sorted view is the values as stored
+        catalog._sorted = tuple(ordered.values())
+        return catalog
 
     def with_additional(self, skills: Iterable[Skill]) -> SkillCatalog:
         """Return a new catalog with additional skills merged by name."""
-        indexed = dict(self._skills)
+        added: dict[str, Skill] = {}
         for skill in skills:
             normalized = self._normalize_name(skill.name)
-            if not normalized or normalized in indexed:
+            if not normalized or normalized in added or normalized in self._skills:
                 continue
-            indexed[normalized] = Skill(
-                name=normalized,
-                description=skill.description,
-                path=skill.path,
-                inline_content=skill.inline_content,
-                source=skill.source,
-            )
-        return SkillCatalog(_skills=indexed)
+            # Skill is frozen, so an already-normalized instance is shared rather than rebuilt
+            added[normalized] = skill if skill.name == normalized else replace(skill, name=normalized)
+        # Layer the additions over the existing index instead of copying it
+        catalog = SkillCatalog(_skills=ChainMap(added, self._skills))
+        # Both sides are already in name order, so merge rather than re-sort
+        catalog._sorted = tuple(heapq.merge(self._sorted_skills(), (added[name] for name in sorted(added)), key=operator.attrgetter("name")))
+        return catalog
+
+    def _sorted_skills(self) -> tuple[Skill, ...]:
+        if self._sorted is None:
+            self._sorted = tuple(self._skills[name] for name in sorted(self._skills))
+        return self._sorted
 
     def list_skills(self) -> list[Skill]:
         """Return all discovered skills sorted by name."""
-        return [self._skills[name] for name in sorted(self._skills)]
+        return list(self._sorted_skills())
 
     def get(self, name: str) -> Skill | None:
         """Resolve skill by exact lowercase name."""
-        return self._skills.get(self._normalize_name(name))
+        # Keys are stored normalized, so an already-normalized name hits directly
+        skill = self._skills.get(name)
+        return skill if skill is not None else self._skills.get(self._normalize_name(name))
+
+    def search(self, query: str, k: int = 5) -> list[Skill]:
+        """Return up to k skills with names similar to query, best match first."""
+        matches = difflib.get_close_matches(self._normalize_name(query), list(self._skills), n=max(1, k), cutoff=0.6)
+        return [self._skills[name] for name in matches]
 
     def format_overview(self) -> str:
         """Render a compact skill summary."""
-        skills = self.list_skills()
-        if not skills:
-            return "(none)"
-        return "\n".join(f"- {skill.name}: {skill.description}" for skill in skills)
+        if self._overview is None:
+            skills = self.list_skills()
+            self._overview = "\n".join(f"- {skill.name}: {skill.description}" for skill in skills) if skills else "(none)"
+        return self._overview
 
     def format_for_system_prompt(self) -> str:
         """Render a richer skills section inspired by production agents."""
+        if self._system_prompt_block is None:
+            self._system_prompt_block = self._render_for_system_prompt()
+        return self._system_prompt_block
+
+    def _render_for_system_prompt(self) -> str:
         skills = self.list_skills()
         if not skills:
             return "(none)"
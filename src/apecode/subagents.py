@@ -36,6 +36,9 @@ DEFAULT_SUBAGENT_PROFILES: tuple[SubagentProfile, ...] = (
     ),
 )
 
+# Non-mutating tools that still make no sense inside a delegated run
+_EXCLUDED_SUBAGENT_TOOLS = frozenset({"update_plan"})
+
 
 class SubagentRunner:
     """Executes delegated prompts with an isolated read-only tool runtime."""
@@ -56,6 +59,9 @@ class SubagentRunner:
         self._max_steps = max(1, max_steps)
         self._profiles = {profile.name: profile for profile in profiles}
         self._callbacks = callbacks
+        # Read-only tool selection, rebuilt only when the parent registry changes
+        self._tools_template: ToolRegistry | None = None
+        self._tools_version = -1
 
     def list_profiles(self) -> list[SubagentProfile]:
         return [self._profiles[name] for name in sorted(self._profiles)]
@@ -86,13 +92,13 @@ class SubagentRunner:
             approval_policy="never",
             plan=[],
         )
-        registry = ToolRegistry(sub_context)
-        for tool in self._parent_tools.list_tools():
-            if tool.mutating:
-                continue
-            if tool.name in {"update_plan"}:
-                continue
-            registry.register(tool)
+        if self._tools_template is not None and self._tools_version == self._parent_tools.version:
+            return self._tools_template.with_context(sub_context)
+
+        version = self._parent_tools.version
+        registry = self._parent_tools.subset(sub_context, lambda tool: not tool.mutating and tool.name not in _EXCLUDED_SUBAGENT_TOOLS)
+        self._tools_template = registry
+        self._tools_version = version
         return registry
 
 
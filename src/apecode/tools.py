@@ -2,14 +2,22 @@
 
 from __future__ import annotations
 
+import contextlib
+import copy
+import functools
+import itertools
 import json
+import os
+import re
 import shutil
 import subprocess
-from collections.abc import Callable
-from dataclasses import dataclass, field
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from enum import StrEnum
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 ApprovalCallback = Callable[[str, str], bool]
 
@@ -26,12 +34,54 @@ class ApprovalPolicy(StrEnum):
     NEVER = "never"
 
 
+# Larger payloads (write_file content, big replacements) are decoded directly so the cache never pins them
+_ARGUMENT_CACHE_MAX_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=256)
+def _decode_arguments(arguments_json: str) -> Any:
+    return json.loads(arguments_json)
+
+
+def parse_tool_arguments(arguments_json: str) -> Any:
+    """Decode tool-call arguments, reusing results for repeated small argument strings.
+
+    Only the top-level dict is copied per call; nested lists and dicts may be shared
+    with other callers and must be treated as read-only.
+    """
+    if not arguments_json or arguments_json == "{}":
+        return {}
+    if len(arguments_json) > _ARGUMENT_CACHE_MAX_CHARS:
+        return json.loads(arguments_json)
+    value = _decode_arguments(arguments_json)
+    # The cached object is shared, so each call gets its own top-level copy
+    return dict(value) if isinstance(value, dict) else value
+
+
+_PREVIEW_LIMIT = 600
+# Non-ASCII text is shown as-is: escaping it costs time and only pushes content past the cut
+_PREVIEW_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def _approval_preview(arguments: dict[str, Any]) -> str:
+    """Return the first _PREVIEW_LIMIT chars of the indented JSON dump without encoding all of it."""
+    # A string clipped to the limit still encodes to at least the limit, so the visible prefix is unchanged
+    clipped = {key: value[:_PREVIEW_LIMIT] if isinstance(value, str) else value for key, value in arguments.items()}
+    parts: list[str] = []
+    size = 0
+    for chunk in _PREVIEW_ENCODER.iterencode(clipped):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= _PREVIEW_LIMIT:
+            break
+    return "".join(parts)[:_PREVIEW_LIMIT]
+
+
 def _is_within(base: Path, target: Path) -> bool:
-    try:
-        target.relative_to(base)
-        return True
-    except ValueError:
-        return False
+    # Plain prefix test on the resolved strings; relative_to would build a path and raise on a miss
+    base_str = os.path.normcase(str(base))
+    target_str = os.path.normcase(str(target))
+    return target_str == base_str or target_str.startswith(base_str.rstrip(os.sep) + os.sep)
 
 
 @dataclass(slots=True)
@@ -46,13 +96,14 @@ class ToolContext:
 
     def __post_init__(self) -> None:
         self.cwd = self.cwd.expanduser().resolve()
+        # Coerced to the enum singletons so policy checks can compare by identity
         self.sandbox_mode = SandboxMode(self.sandbox_mode)
         self.approval_policy = ApprovalPolicy(self.approval_policy)
 
     def resolve_path(self, raw_path: str) -> Path:
-        candidate = Path(raw_path).expanduser()
-        resolved = candidate.resolve() if candidate.is_absolute() else (self.cwd / candidate).resolve()
-        if self.sandbox_mode != "danger-full-access" and not _is_within(self.cwd, resolved):
+        # realpath, not abspath: symlinks must be followed or a link could escape the workspace
+        resolved = Path(os.path.realpath(os.path.join(self.cwd, os.path.expanduser(raw_path))))
+        if self.sandbox_mode is not SandboxMode.DANGER_FULL_ACCESS and not _is_within(self.cwd, resolved):
             raise ValueError(f"path escapes workspace: {raw_path}")
         return resolved
 
@@ -77,30 +128,80 @@ class ToolRegistry:
     def __init__(self, context: ToolContext):
         self.context = context
         self._tools: dict[str, Tool] = {}
+        # Bumped on every registration so callers can cache derived schemas
+        self.version = 0
+        # Derived views, rebuilt lazily after a registration
+        self._sorted: tuple[Tool, ...] | None = None
+        self._openai_tools: tuple[dict[str, Any], ...] | None = None
+        # Plugins and MCP servers may register from loader threads at startup
+        self._lock = threading.Lock()
 
     def register(self, tool: Tool) -> None:
-        self._tools[tool.name] = tool
+        with self._lock:
+            self._tools[tool.name] = tool
+            self.version += 1
+            self._sorted = None
+            self._openai_tools = None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> Tool | None:
+        return self._tools.get(name)
+
+    def with_context(self, context: ToolContext) -> ToolRegistry:
+        """Return a registry holding the same tools, bound to another context."""
+        clone = ToolRegistry(context)
+        with self._lock:
+            clone._tools = dict(self._tools)
+            clone.version = self.version
+            clone._sorted = self._sorted
+            clone._openai_tools = self._openai_tools
+        return clone
+
+    def subset(self, context: ToolContext, keep: Callable[[Tool], bool]) -> ToolRegistry:
+        """Return a registry holding only the tools accepted by keep, bound to another context."""
+        clone = ToolRegistry(context)
+        with self._lock:
+            clone._tools = {name: tool for name, tool in self._tools.items() if keep(tool)}
+            # Continue the parent's counter, as with_context does; a tool count is not a version
+            clone.version = self.version
+        return clone
+
+    def _sorted_tools(self) -> tuple[Tool, ...]:
+        with self._lock:
+            return self._sorted_tools_locked()
+
+    def _sorted_tools_locked(self) -> tuple[Tool, ...]:
+        if self._sorted is None:
+            self._sorted = tuple(self._tools[name] for name in sorted(self._tools))
+        return self._sorted
 
     def list_tools(self) -> list[Tool]:
         """Return registered tools sorted by name."""
-        return [self._tools[name] for name in sorted(self._tools)]
+        return list(self._sorted_tools())
 
     def list_tool_names(self) -> list[str]:
         """Return registered tool names sorted alphabetically."""
-        return [tool.name for tool in self.list_tools()]
+        return [tool.name for tool in self._sorted_tools()]
 
     def as_openai_tools(self) -> list[dict[str, Any]]:
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.parameters,
-                },
-            }
-            for tool in self.list_tools()
-        ]
+        """Return the tool schemas in OpenAI format; entries are shared and must be treated as read-only."""
+        # The schema only changes on register(), so it is built once; callers get their own list
+        with self._lock:
+            if self._openai_tools is None:
+                self._openai_tools = tuple(
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": tool.name,
+                            "description": tool.description,
+                            "parameters": tool.parameters,
+                        },
+                    }
+                    for tool in self._sorted_tools_locked()
+                )
+            return list(self._openai_tools)
 
     def execute(self, name: str, arguments_json: str) -> str:
         tool = self._tools.get(name)
@@ -108,21 +209,21 @@ class ToolRegistry:
             return f"Unknown tool: {name}"
 
         try:
-            arguments = json.loads(arguments_json or "{}")
+            arguments = parse_tool_arguments(arguments_json)
             if not isinstance(arguments, dict):
                 return "Tool arguments must be a JSON object."
         except json.JSONDecodeError as exc:
             return f"Invalid tool arguments JSON: {exc}"
 
         if tool.mutating:
-            if self.context.sandbox_mode == "read-only":
+            if self.context.sandbox_mode is SandboxMode.READ_ONLY:
                 return "blocked by sandbox policy: read-only"
 
-            if self.context.approval_policy == "never":
+            if self.context.approval_policy is ApprovalPolicy.NEVER:
                 return "blocked by approval policy: never"
 
-            if self.context.approval_policy == "on-request":
-                preview = json.dumps(arguments, ensure_ascii=True, indent=2)[:600]
+            if self.context.approval_policy is ApprovalPolicy.ON_REQUEST:
+                preview = _approval_preview(arguments)
                 if not self.context.ask_approval(f"{name}", preview):
                     return "Rejected by user."
 
@@ -132,6 +233,29 @@ class ToolRegistry:
             return f"Tool execution failed: {exc}"
 
 
+def _sorted_entries(path: str) -> Iterator[os.DirEntry[str]]:
+    try:
+        with os.scandir(path) as it:
+            return iter(sorted(it, key=lambda entry: entry.name))
+    except OSError:
+        return iter(())
+
+
+def _walk_sorted(root: str, *, recursive: bool) -> Iterator[tuple[str, bool]]:
+    """Yield (path, is_dir) in sorted pre-order, listing each directory only once it is reached."""
+    stack = [_sorted_entries(root)]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        is_dir = entry.is_dir()
+        yield entry.path, is_dir
+        # Like rglob, list symlinked directories but do not descend into them
+        if recursive and is_dir and not entry.is_symlink():
+            stack.append(_sorted_entries(entry.path))
+
+
 def _list_files(ctx: ToolContext, args: dict[str, Any]) -> str:
     raw_path = str(args.get("path", "."))
     recursive = bool(args.get("recursive", True))
@@ -143,11 +267,13 @@ def _list_files(ctx: ToolContext, args: dict[str, Any]) -> str:
     if root.is_file():
         return str(root.relative_to(ctx.cwd))
 
+    # Entries are reported relative to the workspace, so a root outside it is still an error
+    root.relative_to(ctx.cwd)
+    prefix_len = len(str(ctx.cwd).rstrip(os.sep)) + 1
     entries: list[str] = []
-    iterator = sorted(root.rglob("*")) if recursive else sorted(root.iterdir())
-    for item in iterator:
-        rel = item.relative_to(ctx.cwd)
-        entries.append(f"{rel}/" if item.is_dir() else str(rel))
+    for path, is_dir in _walk_sorted(str(root), recursive=recursive):
+        rel = path[prefix_len:]
+        entries.append(f"{rel}/" if is_dir else rel)
         if len(entries) >= max_entries:
             entries.append(f"... truncated at {max_entries} entries")
             break
@@ -163,15 +289,32 @@ def _read_file(ctx: ToolContext, args: dict[str, Any]) -> str:
     path = ctx.resolve_path(raw_path)
     if not path.exists() or not path.is_file():
         return f"file not found: {path}"
-    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
     start_idx = start_line - 1
-    chunk = lines[start_idx : start_idx + num_lines]
+    # Stream up to the requested window instead of loading the whole file
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        chunk = [line.rstrip("\n") for line in itertools.islice(handle, start_idx, start_idx + num_lines)]
     if not chunk:
         return "(no content)"
     rendered = [f"{line_number:>6}\t{line_text}" for line_number, line_text in enumerate(chunk, start=start_line)]
     return "\n".join(rendered)
 
 
+# O_BINARY only exists on Windows, where it disables newline translation
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+
+
+def _write_bytes(path: Path, data: bytes, *, append: bool = False) -> None:
+    # Straight to the fd: skips the TextIOWrapper/BufferedWriter layers for what is a single write
+    # 0o666 like open(), so the process umask decides the mode of new files
+    fd = os.open(path, _WRITE_FLAGS | (os.O_APPEND if append else os.O_TRUNC), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
 def _write_file(ctx: ToolContext, args: dict[str, Any]) -> str:
     raw_path = str(args["path"])
     content = str(args.get("content", ""))
@@ -179,12 +322,14 @@ def _write_file(ctx: ToolContext, args: dict[str, Any]) -> str:
     if mode not in {"overwrite", "append"}:
         return "mode must be one of: overwrite, append"
     path = ctx.resolve_path(raw_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if mode == "overwrite":
-        path.write_text(content, encoding="utf-8")
-    else:
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(content)
+    data = content.encode("utf-8")
+    append = mode == "append"
+    try:
+        _write_bytes(path, data, append=append)
+    except FileNotFoundError:
+        # Parents are created only when the open fails, so writes into existing directories skip the mkdir probes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_bytes(path, data, append=append)
     return f"wrote {len(content)} bytes to {path.relative_to(ctx.cwd)} ({mode})"
 
 
@@ -198,13 +343,154 @@ def _replace_in_file(ctx: ToolContext, args: dict[str, Any]) -> str:
     if not path.exists() or not path.is_file():
         return f"file not found: {path}"
     content = path.read_text(encoding="utf-8", errors="replace")
-    replaced, n = content.replace(old, new, count), content.count(old)
-    if n == 0:
+    if not old:
+        return "old must not be empty"
+    # One scan: split yields a single part when there is nothing to replace
+    parts = content.split(old, count)
+    if len(parts) == 1:
         return "no replacements made"
-    path.write_text(replaced, encoding="utf-8")
+    _write_bytes(path, new.join(parts).encode("utf-8"))
     return f"applied replacements in {path.relative_to(ctx.cwd)}"
 
 
+def _feed_stdin(stream: IO[bytes], data: bytes) -> None:
+    # A command that exits without reading its input must not fail the call
+    with contextlib.suppress(OSError):
+        stream.write(data)
+    with contextlib.suppress(OSError):
+        stream.close()
+
+
+def _read_capped(stream: IO[bytes], sink: bytearray, limit: int, on_full: Callable[[], None] | None) -> None:
+    # Past the cap the pipe is still drained so the child never blocks on a full pipe
+    while chunk := stream.read1(65536):
+        room = limit - len(sink)
+        if room > 0:
+            sink += chunk[:room]
+        elif on_full is not None:
+            on_full()
+            on_full = None
+    stream.close()
+
+
+@dataclass(frozen=True, slots=True)
+class CappedRun:
+    """Result of run_capped."""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    truncated: bool
+    """True when stdout reached the limit and the rest was discarded."""
+
+
+# UTF-8 needs at most this many bytes per char, so limit=UTF8_MAX_CHAR_BYTES * chars always covers a char cap
+UTF8_MAX_CHAR_BYTES = 4
+
+
+def run_capped(
+    command: str | Sequence[str],
+    *,
+    shell: bool,
+    cwd: Path | None,
+    timeout: float | None,
+    limit: int,
+    input_data: bytes | None = None,
+    merge_stderr: bool = False,
+    kill_when_full: bool = False,
+) -> CappedRun:
+    """Run a command keeping at most ``limit`` bytes of each output stream in memory.
+
+    Raises ``subprocess.TimeoutExpired`` after killing the child, like ``subprocess.run``.
+    """
+    proc = subprocess.Popen(
+        command,
+        shell=shell,
+        cwd=cwd,
+        stdin=subprocess.PIPE if input_data is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+    )
+    stdout, stderr = bytearray(), bytearray()
+    on_full = proc.kill if kill_when_full else None
+    workers = [threading.Thread(target=_read_capped, args=(proc.stdout, stdout, limit, on_full), daemon=True)]
+    if not merge_stderr:
+        workers.append(threading.Thread(target=_read_capped, args=(proc.stderr, stderr, limit, None), daemon=True))
+    if input_data is not None:
+        workers.append(threading.Thread(target=_feed_stdin, args=(proc.stdin, input_data), daemon=True))
+    for worker in workers:
+        worker.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for worker in workers:
+            # Bounded: a grandchild of a shell command may keep the pipes open
+            worker.join(timeout=5)
+    return CappedRun(returncode=returncode, stdout=bytes(stdout), stderr=bytes(stderr), truncated=len(stdout) >= limit)
+
+
+# Path prefix plus a line capped by --max-columns 2000
+_RG_LINE_BYTES = 4096
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+_GREP_BATCH_FILES = 64
+# Larger files are skipped by the fallback rather than decoded whole
+_GREP_MAX_FILE_BYTES = 16 * 1024 * 1024
+
+
+def _grep_file(path: str, literal: str | None, regex: re.Pattern[str], limit: int) -> list[tuple[int, str]]:
+    """Return up to limit (line number, line) pairs matching in one file."""
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size > _GREP_MAX_FILE_BYTES:
+                return []
+            # Skip binary files the way ripgrep does: a NUL byte near the start, checked before reading the rest
+            head = handle.read(8192)
+            if b"\x00" in head:
+                return []
+            data = head + handle.read()
+    except OSError:
+        return []
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return []
+    # Search the whole buffer in C and only split out the lines that match
+    found_lines: list[tuple[int, str]] = []
+    line_no = 1
+    pos = counted = 0
+    while pos < len(text):
+        if literal is not None:
+            found = text.find(literal, pos)
+        else:
+            match = regex.search(text, pos)
+            found = -1 if match is None else match.start()
+        if found == -1:
+            break
+        start = text.rfind("\n", 0, found) + 1
+        end = text.find("\n", found)
+        if end == -1:
+            end = len(text)
+        line_no += text.count("\n", counted, start)
+        counted = start
+        found_lines.append((line_no, text[start:end].rstrip("\r")))
+        if len(found_lines) >= limit:
+            break
+        pos = end + 1
+    return found_lines
+
+
+@functools.cache
+def _rg_path() -> str | None:
+    # Resolved once per process; PATH does not change under a running session
+    return shutil.which("rg")
+
+
 def _grep_files(ctx: ToolContext, args: dict[str, Any]) -> str:
     pattern = str(args["pattern"])
     raw_path = str(args.get("path", "."))
@@ -212,56 +498,61 @@ def _grep_files(ctx: ToolContext, args: dict[str, Any]) -> str:
     max_results = int(args.get("max_results", 200))
     max_results = max(1, min(max_results, 2000))
     root = ctx.resolve_path(raw_path)
-    if shutil.which("rg"):
-        cmd = ["rg", "--line-number", "--no-heading", pattern, str(root)]
+    rg = _rg_path()
+    if rg:
+        # No file can contribute more than max_results lines, and minified one-liners are elided
+        cmd = [rg, "--line-number", "--no-heading", "--max-count", str(max_results), "--max-columns", "2000"]
+        if _REGEX_META.isdisjoint(pattern):
+            cmd.append("--fixed-strings")
+        cmd.extend(["-e", pattern, str(root)])
         if include:
             cmd.extend(["-g", str(include)])
-        proc = subprocess.run(
-            cmd,
-            cwd=ctx.cwd,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if proc.returncode not in (0, 1):
-            return f"rg failed: {proc.stderr.strip()}"
-        lines = proc.stdout.splitlines()[:max_results]
+        # rg is stopped once it has printed more than can be returned; --max-columns bounds each line
+        run = run_capped(cmd, shell=False, cwd=ctx.cwd, timeout=None, limit=max_results * _RG_LINE_BYTES, kill_when_full=True)
+        if run.returncode not in (0, 1) and not run.truncated:
+            return f"rg failed: {run.stderr.decode('utf-8', errors='replace').strip()}"
+        # Decode only the lines that are returned
+        lines = [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in run.stdout.split(b"\n", max_results)[:max_results] if line]
         return "\n".join(lines) if lines else "(no matches)"
 
+    # Patterns without metacharacters go through str.find, which is much faster than the regex engine
+    literal = pattern if _REGEX_META.isdisjoint(pattern) else None
+    try:
+        regex = re.compile(pattern, re.MULTILINE)
+    except re.error as exc:
+        return f"invalid regex: {exc}"
+
+    def scan(path: str) -> list[tuple[int, str]]:
+        return _grep_file(path, literal, regex, max_results)
+
     matches: list[str] = []
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        try:
-            text = path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            continue
-        for line_no, line in enumerate(text.splitlines(), start=1):
-            if pattern in line:
-                matches.append(f"{path.relative_to(ctx.cwd)}:{line_no}:{line}")
-                if len(matches) >= max_results:
-                    return "\n".join(matches)
+    files = (path for path, is_dir in _walk_sorted(str(root), recursive=True) if not is_dir)
+    # Reads release the GIL, so files are scanned on a pool; batches keep the output in walk order
+    # and stop the walk soon after max_results is reached
+    with ThreadPoolExecutor() as pool:
+        for batch in itertools.batched(files, _GREP_BATCH_FILES, strict=False):
+            for path, found in zip(batch, pool.map(scan, batch), strict=True):
+                rel = Path(path).relative_to(ctx.cwd)
+                for line_no, line in found:
+                    matches.append(f"{rel}:{line_no}:{line}")
+                    if len(matches) >= max_results:
+                        return "\n".join(matches)
     return "\n".join(matches) if matches else "(no matches)"
 
 
+_EXEC_LIMIT_CHARS = 6000
+_EXEC_LIMIT_BYTES = UTF8_MAX_CHAR_BYTES * _EXEC_LIMIT_CHARS
+
+
 def _exec_command(ctx: ToolContext, args: dict[str, Any]) -> str:
     command = str(args["command"])
     timeout = int(args.get("timeout_sec", 120))
     timeout = max(1, min(timeout, 1800))
-    proc = subprocess.run(
-        command,
-        shell=True,
-        cwd=ctx.cwd,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-        check=False,
-    )
-    output = (proc.stdout or "") + (proc.stderr or "")
-    output = output.strip()
-    if len(output) > 6000:
-        output = output[:6000] + "\n... (truncated)"
-    return f"exit_code={proc.returncode}\n{output}"
+    run = run_capped(command, shell=True, cwd=ctx.cwd, timeout=timeout, limit=_EXEC_LIMIT_BYTES, merge_stderr=True)
+    output = run.stdout.decode("utf-8", errors="replace").strip()
+    if run.truncated or len(output) > _EXEC_LIMIT_CHARS:
+        output = output[:_EXEC_LIMIT_CHARS] + "\n... (truncated)"
+    return f"exit_code={run.returncode}\n{output}"
 
 
 def _update_plan(ctx: ToolContext, args: dict[str, Any]) -> str:
@@ -280,13 +571,14 @@ def _update_plan(ctx: ToolContext, args: dict[str, Any]) -> str:
             return "status must be pending | in_progress | completed"
         normalized.append({"step": step, "status": status})
     ctx.plan = normalized
-    return json.dumps({"ok": True, "plan_size": len(ctx.plan)})
+    # Fixed shape, so format it directly; matches json.dumps output byte for byte
+    return f'{{"ok": true, "plan_size": {len(ctx.plan)}}}'
 
 
-def create_default_registry(context: ToolContext) -> ToolRegistry:
-    """Build default nano agent tools."""
-    registry = ToolRegistry(context)
-    registry.register(
+@functools.cache
+def _default_tools() -> tuple[Tool, ...]:
+    # Descriptions and handlers are built once; create_default_registry copies the schema dicts per registry
+    return (
         Tool(
             name="list_files",
             description=(
@@ -316,9 +608,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
                 "additionalProperties": False,
             },
             handler=_list_files,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="read_file",
             description=(
@@ -348,9 +638,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
                 "additionalProperties": False,
             },
             handler=_read_file,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="grep_files",
             description=(
@@ -384,9 +672,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
                 "additionalProperties": False,
             },
             handler=_grep_files,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="write_file",
             description=(
@@ -417,9 +703,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
             },
             handler=_write_file,
             mutating=True,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="replace_in_file",
             description=(
@@ -453,9 +737,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
             },
             handler=_replace_in_file,
             mutating=True,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="exec_command",
             description=(
@@ -482,9 +764,7 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
             },
             handler=_exec_command,
             mutating=True,
-        )
-    )
-    registry.register(
+        ),
         Tool(
             name="update_plan",
             description=(
@@ -521,6 +801,14 @@ def create_default_registry(context: ToolContext) -> ToolRegistry:
                 "additionalProperties": False,
             },
             handler=_update_plan,
-        )
+        ),
     )
+
+
+def create_default_registry(context: ToolContext) -> ToolRegistry:
+    """Build default nano agent tools."""
+    registry = ToolRegistry(context)
+    for tool in _default_tools():
+        # Schemas are mutable dicts, so each registry gets its own rather than aliasing the cached set
+        registry.register(replace(tool, parameters=copy.deepcopy(tool.parameters)))
     return registry
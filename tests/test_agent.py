@@ -3,14 +3,15 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 from typing import Any
 
 import pytest
 
-from apecode.agent import AgentConfig, NanoCodeAgent
+from apecode.agent import AgentCallbacks, AgentConfig, NanoCodeAgent, SemanticCache
 from apecode.system_prompt import build_system_prompt
-from apecode.tools import ToolContext, create_default_registry
+from apecode.tools import Tool, ToolContext, create_default_registry
 
 
 class FakeModel:
@@ -58,6 +59,93 @@ class LoopingModel:
         }
 
 
+class CountingModel:
+    """A model that answers directly and counts calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def complete(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        _ = (messages, tools)
+        self.calls += 1
+        return {"role": "assistant", "content": f"answer {self.calls}"}
+
+
+class SameAnswerModel:
+    """A model that always gives the same direct answer and counts calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def complete(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        _ = (messages, tools)
+        self.calls += 1
+        return {"role": "assistant", "content": "ok"}
+
+
+class ParallelCallsModel:
+    """A model that issues two independent tool calls in one step."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def complete(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        _ = (messages, tools)
+        self.calls += 1
+        if self.calls == 1:
+            return {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {"id": f"call_{idx}", "type": "function", "function": {"name": "rendezvous", "arguments": json.dumps({"tag": tag})}} for idx, tag in enumerate(("a", "b"))
+                ],
+            }
+        return {"role": "assistant", "content": "done"}
+
+
+class RecordingToolModel:
+    """A model that lists files for a number of steps before answering, recording each request."""
+
+    def __init__(self, tool_steps: int) -> None:
+        self.tool_steps = tool_steps
+        self.calls = 0
+        self.requests: list[list[dict[str, Any]]] = []
+
+    def complete(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        _ = tools
+        self.requests.append(list(messages))
+        self.calls += 1
+        if self.calls <= self.tool_steps:
+            return {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [{"id": f"call_{self.calls}", "type": "function", "function": {"name": "list_files", "arguments": "{}"}}],
+            }
+        return {"role": "assistant", "content": f"answer {self.calls}"}
+
+
+class StreamingModel:
+    """A model that streams a fragmented tool call, then a text answer."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def complete(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        raise AssertionError("stream() should be preferred when on_token is set")
+
+    def stream(self, *, messages: list[dict[str, Any]], tools: list[dict[str, Any]]):
+        _ = (messages, tools)
+        self.calls += 1
+        if self.calls == 1:
+            yield {"tool_calls_delta": [{"index": 0, "id": "call_1", "function": {"name": "read_", "arguments": '{"path": '}}]}
+            yield {"tool_calls_delta": [{"index": 0, "function": {"name": "file", "arguments": '"note.txt"}'}}]}
+            yield {"finish_reason": "tool_calls"}
+            return
+        for token in ("Done", ": ", "streamed."):
+            yield {"content_delta": token}
+        yield {"finish_reason": "stop"}
+
+
 def test_agent_runs_tool_then_finishes(tmp_path: Path) -> None:
     (tmp_path / "note.txt").write_text("hello", encoding="utf-8")
     ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
@@ -83,3 +171,145 @@ def test_max_steps_guard(tmp_path: Path) -> None:
     )
     with pytest.raises(RuntimeError):
         agent.run("loop forever")
+
+
+def test_semantic_cache_matches_rephrased_turns() -> None:
+    cache = SemanticCache()
+    answer = {"role": "assistant", "content": "answer 1"}
+    cache.put("ns", "What does the cli module do?", answer)
+    assert cache.get("ns", "what does the CLI module do") == answer
+    assert cache.get("ns", "Summarize the plugin loader") is None
+    assert cache.get("other", "What does the cli module do?") is None
+
+
+def test_semantic_cache_misses_reordered_and_history_dependent_turns(tmp_path: Path) -> None:
+    cache = SemanticCache()
+    cache.put("ns", "rename foo to bar", {"role": "assistant", "content": "renamed"})
+    assert cache.get("ns", "rename bar to foo") is None
+
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    model = CountingModel()
+    agent = NanoCodeAgent(
+        model=model,
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        config=AgentConfig(semantic_cache_enabled=True),
+    )
+    # The same question after a different answer is a different context
+    assert agent.run("What does the cli module do?") == "answer 1"
+    assert agent.run("what does the CLI module do") == "answer 2"
+    assert model.calls == 2
+
+
+def test_semantic_cache_requires_identical_paths_and_identifiers() -> None:
+    cache = SemanticCache()
+    prompt = "read src/apecode/{} and explain how the registry dispatches tool calls and handles approval for mutating tools"
+    cache.put("ns", prompt.format("tools.py"), {"role": "assistant", "content": "ANSWER FOR tools.py"})
+    assert cache.get("ns", prompt.format("skills.py")) is None
+    assert cache.get("ns", prompt.format("tools.py")) == {"role": "assistant", "content": "ANSWER FOR tools.py"}
+    cache.put("ns", "why does parse_tool_arguments copy the top level dict", {"role": "assistant", "content": "copy"})
+    assert cache.get("ns", "why does _decode_arguments copy the top level dict") is None
+
+
+def test_semantic_cache_reuses_answers_in_the_same_context(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    model = SameAnswerModel()
+    agent = NanoCodeAgent(
+        model=model,
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        config=AgentConfig(semantic_cache_enabled=True),
+    )
+    agent.run("What does the cli module do?")
+    # Every turn now follows the same answer, so the second repeat is a hit
+    agent.run("What does the cli module do?")
+    agent.run("what does the CLI module do")
+    assert model.calls == 2
+    # Short follow-ups are never served from the cache, even in the same context
+    agent.run("continue")
+    agent.run("continue")
+    assert model.calls == 4
+
+
+def test_read_only_tool_calls_run_concurrently(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    tools = create_default_registry(ctx)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _rendezvous(_ctx: ToolContext, args: dict[str, Any]) -> str:
+        barrier.wait()
+        return f"tag:{args['tag']}"
+
+    tools.register(Tool(name="rendezvous", description="Wait for a peer call.", parameters={"type": "object"}, handler=_rendezvous))
+    agent = NanoCodeAgent(model=ParallelCallsModel(), tools=tools, system_prompt="base prompt")
+    assert agent.run("go") == "done"
+    tool_messages = [message for message in agent.messages if message["role"] == "tool"]
+    assert [message["tool_call_id"] for message in tool_messages] == ["call_0", "call_1"]
+    assert [message["content"] for message in tool_messages] == ["tag:a", "tag:b"]
+
+
+def test_streaming_merges_deltas_and_forwards_tokens(tmp_path: Path) -> None:
+    (tmp_path / "note.txt").write_text("hello", encoding="utf-8")
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    tokens: list[str] = []
+    agent = NanoCodeAgent(
+        model=StreamingModel(),
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        callbacks=AgentCallbacks(on_token=tokens.append),
+    )
+    assert agent.run("read note") == "Done: streamed."
+    assert tokens == ["Done", ": ", "streamed."]
+    tool_message = next(message for message in agent.messages if message["role"] == "tool")
+    assert "hello" in tool_message["content"]
+
+
+def test_history_window_keeps_system_and_whole_turns(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    agent = NanoCodeAgent(
+        model=CountingModel(),
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        config=AgentConfig(history_window=3),
+    )
+    for idx in range(5):
+        agent.run(f"question {idx}")
+    messages = agent.messages
+    assert messages[0] == {"role": "system", "content": "base prompt"}
+    assert len(messages) <= 4
+    assert messages[1]["role"] == "user"
+    assert messages[-1] == {"role": "assistant", "content": "answer 5"}
+
+
+def test_context_token_budget_evicts_oldest_turns(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    agent = NanoCodeAgent(
+        model=CountingModel(),
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        config=AgentConfig(history_window=None, context_token_budget=100),
+    )
+    for idx in range(10):
+        agent.run(f"question {idx} " + "x" * 80)
+    assert agent.context_tokens <= 80
+    assert agent.messages[1]["role"] == "user"
+    assert agent.messages[-2]["content"].startswith("question 9")
+
+
+def test_history_window_keeps_previous_turn_longer_than_window(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    model = RecordingToolModel(tool_steps=5)
+    agent = NanoCodeAgent(
+        model=model,
+        tools=create_default_registry(ctx),
+        system_prompt="base prompt",
+        config=AgentConfig(history_window=6),
+    )
+    assert agent.run("q1") == "answer 6"
+    assert agent.run("q2") == "answer 7"
+    last_request = model.requests[-1]
+    assert last_request[1] == {"role": "user", "content": "q1"}
+    assert {"role": "assistant", "content": "answer 6"} in last_request
+    assert last_request[-1] == {"role": "user", "content": "q2"}
+    # Once q2 has completed, the q1 turn may be evicted
+    assert agent.messages[1:] == [{"role": "user", "content": "q2"}, {"role": "assistant", "content": "answer 7"}]
@@ -44,6 +44,11 @@ def test_skill_command_builds_agent_input(tmp_path: Path) -> None:
     assert "Use a short style" in result.agent_input
     assert "explain this file" in result.agent_input
 
+    typo_result = commands.run("/skill dmeo")
+    assert typo_result is not None
+    assert typo_result.agent_input is None
+    assert "Did you mean `demo`?" in typo_result.output
+
 
 def test_unknown_command() -> None:
     ctx = ToolContext(cwd=Path.cwd(), ask_approval=lambda _a, _p: True)
@@ -55,6 +60,10 @@ def test_unknown_command() -> None:
     assert result is not None
     assert "Unknown command" in result.output
 
+    typo_result = commands.run("/hlep")
+    assert typo_result is not None
+    assert "Did you mean /help?" in typo_result.output
+
 
 def test_delegate_commands() -> None:
     class FakeSubagents:
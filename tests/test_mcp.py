@@ -16,9 +16,11 @@ def test_load_and_execute_mcp_tool(tmp_path: Path) -> None:
         (
             "from fastmcp import FastMCP\n"
             "mcp=FastMCP('demo')\n"
+            "calls=[]\n"
             "@mcp.tool(description='Echo text')\n"
             "def echo(text: str) -> str:\n"
-            "  return 'mcp:'+text\n"
+            "  calls.append(text)\n"
+            "  return f'mcp:{text}:{len(calls)}'\n"
             "if __name__=='__main__':\n"
             "  mcp.run(transport='stdio')\n"
         ),
@@ -46,6 +48,9 @@ def test_load_and_execute_mcp_tool(tmp_path: Path) -> None:
         assert len(bridge.tool_names) == 1
         tool_name = bridge.tool_names[0]
         result = registry.execute(tool_name, json.dumps({"text": "hello"}))
-        assert "mcp:hello" in result
+        assert "mcp:hello:1" in result
+        # The server process is reused, so its call counter keeps growing
+        second = registry.execute(tool_name, json.dumps({"text": "again"}))
+        assert "mcp:again:2" in second
     finally:
         bridge.close()
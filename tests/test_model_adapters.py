@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import json
+from types import SimpleNamespace
+from typing import Any
 
 from apecode.model_adapters import (
+    AnthropicMessagesClient,
     _anthropic_message_to_openai,
+    _openai_chunk_to_delta,
     _openai_messages_to_anthropic,
 )
 
@@ -39,14 +43,58 @@ def test_openai_to_anthropic_conversion() -> None:
 
 
 def test_anthropic_to_openai_conversion() -> None:
-    message = {
-        "content": [
-            {"type": "text", "text": "Working on it."},
-            {"type": "tool_use", "id": "abc", "name": "list_files", "input": {"path": "."}},
+    message = SimpleNamespace(
+        content=[
+            SimpleNamespace(type="text", text="Working on it."),
+            SimpleNamespace(type="tool_use", id="abc", name="list_files", input={"path": "."}),
         ]
-    }
+    )
     converted = _anthropic_message_to_openai(message)
     assert converted["role"] == "assistant"
     assert converted["content"] == "Working on it."
     assert converted["tool_calls"][0]["id"] == "abc"
     assert converted["tool_calls"][0]["function"]["name"] == "list_files"
+
+
+def test_openai_stream_chunk_conversion() -> None:
+    tool_call = SimpleNamespace(index=0, id="call_1", function=SimpleNamespace(name="read_file", arguments='{"pa'))
+    chunk = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Hi", tool_calls=[tool_call]), finish_reason=None)])
+    delta = _openai_chunk_to_delta(chunk)
+    assert delta is not None
+    assert delta["content_delta"] == "Hi"
+    assert delta["reasoning_delta"] == ""
+    assert delta["tool_calls_delta"] == [{"index": 0, "id": "call_1", "function": {"name": "read_file", "arguments": '{"pa'}}]
+    assert _openai_chunk_to_delta(SimpleNamespace(choices=[])) is None
+
+
+def test_anthropic_cache_breakpoints_cover_only_the_stable_prefix(monkeypatch) -> None:
+    requests: list[dict[str, Any]] = []
+
+    class FakeAnthropic:
+        def __init__(self, **_kwargs: Any) -> None:
+            self.messages = SimpleNamespace(create=self._create)
+
+        def _create(self, **payload: Any) -> Any:
+            requests.append(payload)
+            return SimpleNamespace(content=[SimpleNamespace(type="text", text="ok")])
+
+    class FakeError(Exception):
+        pass
+
+    monkeypatch.setattr("apecode.model_adapters._require_anthropic_sdk", lambda: (FakeAnthropic, FakeError, FakeError, FakeError))
+    client = AnthropicMessagesClient(api_key="key", model="model")
+    tools = [{"type": "function", "function": {"name": name, "description": "", "parameters": {"type": "object"}}} for name in ("a", "b")]
+    messages = [
+        {"role": "system", "content": "You are agent."},
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "answer"},
+        {"role": "user", "content": "second"},
+    ]
+    client.complete(messages=messages, tools=tools)
+
+    payload = requests[0]
+    assert [tool.get("cache_control") for tool in payload["tools"]] == [None, {"type": "ephemeral"}]
+    assert payload["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert not any("cache_control" in block for message in payload["messages"] for block in message["content"])
+    # The caller's schema list is left untouched
+    assert "cache_control" not in tools[-1]
@@ -90,3 +90,16 @@ def test_invalid_plugin_manifest_is_reported(tmp_path: Path) -> None:
     assert result.commands == []
     assert result.skills == []
     assert len(result.errors) == 1
+
+
+def test_edited_manifest_is_reparsed(tmp_path: Path) -> None:
+    plugin_dir = tmp_path / "plugins" / "notes"
+    plugin_dir.mkdir(parents=True)
+    manifest = plugin_dir / "apecode_plugin.json"
+    manifest.write_text(json.dumps({"name": "Notes", "commands": [{"name": "first"}]}), encoding="utf-8")
+
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    assert [spec.name for spec in load_plugins(create_default_registry(ctx), [tmp_path / "plugins"]).commands] == ["first"]
+
+    manifest.write_text(json.dumps({"name": "Notes", "commands": [{"name": "second-one"}]}), encoding="utf-8")
+    assert [spec.name for spec in load_plugins(create_default_registry(ctx), [tmp_path / "plugins"]).commands] == ["second_one"]
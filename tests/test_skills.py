@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
-from apecode.skills import Skill, SkillCatalog
+from apecode.skills import SKILL_FILE_NAME, Skill, SkillCatalog
 
 
 def test_discover_nested_skill_dirs(tmp_path: Path) -> None:
@@ -24,6 +25,7 @@ def test_discover_nested_skill_dirs(tmp_path: Path) -> None:
     assert names == ["one", "two"]
     assert "First skill" in catalog.format_overview()
     assert "### How to use skills" in catalog.format_for_system_prompt()
+    assert [skill.name for skill in catalog.search("tow")] == ["two"]
 
 
 def test_merge_inline_skill() -> None:
@@ -41,3 +43,27 @@ def test_merge_inline_skill() -> None:
     skill = merged.get("inline")
     assert skill is not None
     assert "Use concise output." in skill.read_text()
+
+
+def test_edited_skill_description_is_refreshed(tmp_path: Path) -> None:
+    skill_file = tmp_path / "skills" / "notes" / "SKILL.md"
+    skill_file.parent.mkdir(parents=True)
+    skill_file.write_text("# Notes\n\nOld description", encoding="utf-8")
+    assert SkillCatalog.from_roots([tmp_path / "skills"]).list_skills()[0].description == "Old description"
+
+    mtime_ns = skill_file.stat().st_mtime_ns
+    skill_file.write_text("# Notes\n\nNew description", encoding="utf-8")
+    os.utime(skill_file, ns=(mtime_ns + 1_000_000, mtime_ns + 1_000_000))
+    assert SkillCatalog.from_roots([tmp_path / "skills"]).list_skills()[0].description == "New description"
+
+
+def test_skill_body_is_reread_after_edit(tmp_path: Path) -> None:
+    skill_file = tmp_path / "demo" / SKILL_FILE_NAME
+    skill_file.parent.mkdir()
+    skill_file.write_bytes(b"# Demo\r\nFirst body.\r\n")
+    skill = SkillCatalog.from_roots([tmp_path]).get("demo")
+    assert skill is not None
+    assert skill.read_text() == "# Demo\nFirst body."
+
+    skill_file.write_text("# Demo\nSecond, longer body.\n", encoding="utf-8")
+    assert skill.read_text() == "# Demo\nSecond, longer body."
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any
 
 from apecode.subagents import SubagentRunner
-from apecode.tools import ToolContext, create_default_registry
+from apecode.tools import Tool, ToolContext, create_default_registry
 
 
 class _DelegateModel:
@@ -45,3 +45,20 @@ def test_subagent_uses_read_only_tools(tmp_path: Path) -> None:
     assert "read_file" in names
     assert "write_file" not in names
     assert "exec_command" not in names
+
+
+def test_subagent_tools_are_reused_until_parent_changes(tmp_path: Path) -> None:
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    tools = create_default_registry(ctx)
+    runner = SubagentRunner(
+        model=_DelegateModel(),
+        parent_tools=tools,
+        base_system_prompt="base prompt",
+    )
+    first = runner._build_subagent_tools()
+    second = runner._build_subagent_tools()
+    assert second.list_tool_names() == first.list_tool_names()
+    assert second.context is not first.context
+
+    tools.register(Tool(name="peek", description="peek", parameters={"type": "object"}, handler=lambda _ctx, _args: "ok"))
+    assert "peek" in runner._build_subagent_tools().list_tool_names()
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import json
+import os
+import stat
 from pathlib import Path
 
-from apecode.tools import ToolContext, create_default_registry
+from apecode.tools import Tool, ToolContext, create_default_registry
 
 
 def test_write_and_read_file(tmp_path: Path) -> None:
@@ -94,3 +96,47 @@ def test_update_plan(tmp_path: Path) -> None:
     assert payload["ok"] is True
     assert payload["plan_size"] == 2
     assert len(ctx.plan) == 2
+
+
+def test_grep_fallback_matches_regex_per_line(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("apecode.tools._rg_path", lambda: None)
+    (tmp_path / "notes.txt").write_text("alpha\nbeta alpha alpha\ngamma\n", encoding="utf-8")
+    (tmp_path / "blob.bin").write_bytes(b"alpha\x00")
+    ctx = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    registry = create_default_registry(ctx)
+
+    result = registry.execute("grep_files", json.dumps({"pattern": "^(alpha|gamma)"}))
+    assert result.splitlines() == ["notes.txt:1:alpha", "notes.txt:3:gamma"]
+    assert registry.execute("grep_files", json.dumps({"pattern": "alpha"})).splitlines() == ["notes.txt:1:alpha", "notes.txt:2:beta alpha alpha"]
+
+
+def test_openai_schema_is_cached_until_register(tmp_path: Path) -> None:
+    registry = create_default_registry(ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True))
+    first = registry.as_openai_tools()
+    first.append({"type": "function", "function": {"name": "injected"}})
+    assert registry.as_openai_tools() == first[:-1]
+
+    registry.register(Tool(name="aaa_tool", description="d", parameters={"type": "object"}, handler=lambda _c, _a: "ok"))
+    refreshed = registry.as_openai_tools()
+    assert len(refreshed) == len(first)
+    assert refreshed[0]["function"]["name"] == "aaa_tool"
+    assert registry.list_tool_names()[0] == "aaa_tool"
+
+
+def test_new_files_respect_umask(tmp_path: Path) -> None:
+    registry = create_default_registry(ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True))
+    previous = os.umask(0o002)
+    try:
+        registry.execute("write_file", json.dumps({"path": "shared.txt", "content": "x"}))
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE((tmp_path / "shared.txt").stat().st_mode) == 0o664
+
+
+def test_default_registries_do_not_share_schema_dicts(tmp_path: Path) -> None:
+    context = ToolContext(cwd=tmp_path, ask_approval=lambda _a, _p: True)
+    first = create_default_registry(context)
+    second = create_default_registry(context)
+    first.list_tools()[0].parameters["properties"]["injected"] = {"type": "string"}
+    assert "injected" not in second.list_tools()[0].parameters["properties"]
+    assert "injected" not in create_default_registry(context).list_tools()[0].parameters["properties"]